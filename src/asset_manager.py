@@ -0,0 +1,68 @@
+import os
+import pygame
+from typing import Dict, List, Tuple
+
+
+class AssetManager:
+    def __init__(self, directory: str = 'src') -> None:
+        """
+        Initialize the AssetManager, which loads every image from disk once
+        and keeps every scaled variant that was asked for.
+
+        Args:
+            directory (str): The directory the images are loaded from.
+        """
+        self.directory = directory
+        self.images: Dict[str, pygame.Surface] = {}
+        self.scaled: Dict[Tuple[str, int], pygame.Surface] = {}
+        self.atlases: Dict[int, pygame.Surface] = {}
+
+    def prepare(self, surface: pygame.Surface) -> pygame.Surface:
+        """
+        Convert a surface to the display's pixel format for fast blitting, once a display exists.
+
+        Args:
+            surface (pygame.Surface): The surface to convert.
+
+        Returns:
+            pygame.Surface: The converted surface.
+        """
+        if pygame.display.get_surface() is None:
+            return surface
+        return surface.convert_alpha() if surface.get_alpha() is not None else surface.convert()
+
+    def getImage(self, image_name: str, size: int) -> pygame.Surface:
+        """
+        Get an image scaled to size x size, decoding and scaling it only the first time.
+
+        Args:
+            image_name (str): The filename of the image.
+            size (int): The size to which the image should be scaled.
+
+        Returns:
+            pygame.Surface: The scaled image surface.
+        """
+        key = (image_name, size)
+        if key not in self.scaled:
+            if image_name not in self.images:
+                self.images[image_name] = pygame.image.load(os.path.join(self.directory, image_name))
+            self.scaled[key] = self.prepare(pygame.transform.scale(self.images[image_name], (size, size)))
+        return self.scaled[key]
+
+    def buildAtlas(self, image_names: List[str], size: int) -> None:
+        """
+        Pack the given images at one size side by side into a single surface.
+        Later requests for those images at that size return views into the atlas.
+
+        Args:
+            image_names (List[str]): The filenames of the images to pack.
+            size (int): The size of every packed image.
+        """
+        atlas = pygame.Surface((size * len(image_names), size))
+        atlas = self.prepare(atlas)
+        for i, image_name in enumerate(image_names):
+            atlas.blit(self.getImage(image_name, size), (i * size, 0))
+
+        for i, image_name in enumerate(image_names):
+            self.scaled[(image_name, size)] = atlas.subsurface(pygame.Rect(i * size, 0, size, size))
+        self.atlases[size] = atlas
@@ -0,0 +1,251 @@
+import os
+import sys
+import json
+import time
+import argparse
+import statistics
+from functools import partial
+from pathlib import Path
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Dict, List, Optional, Tuple
+
+sys.path.append(str(Path(__file__).resolve().parent / 'generator' / 'Model - 2'))
+from generator import MapGenerator
+from vector_generator import VectorMapGenerator
+from maze_generator import MazeGenerator, BACKTRACKER, ELLER
+from map_pack import PackWriter, packRecord
+from tile_grid import START, END, SEEKER
+
+ENGINES = ('vector', 'python', BACKTRACKER, ELLER)
+
+# Maps generated by one worker task, large enough to keep the pool's overhead small
+BATCH_SIZE = 64
+
+
+def makeGenerator(engine: str, params: Tuple, seed: Any) -> MapGenerator:
+    """
+    Create the generator for an engine.
+
+    Args:
+        engine (str): 'vector', 'python', 'backtracker' or 'eller'.
+        params (Tuple): width, height, seekers, collectibles, density and tile size.
+        seed (Any): Seed of the stream the generator draws map seeds from.
+
+    Returns:
+        MapGenerator: The generator.
+    """
+    if engine == 'vector':
+        return VectorMapGenerator.fromParams(params, seed)
+    if engine == 'python':
+        return MapGenerator.fromParams(params, seed)
+    return MazeGenerator.fromParams(params + (engine,), seed)
+
+
+def positiveInt(text: str) -> int:
+    """
+    Parse a command line option that has to be at least 1.
+
+    Args:
+        text (str): The option's value.
+
+    Returns:
+        int: The value.
+    """
+    value = int(text)
+    if value < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {value}")
+    return value
+
+
+def bakeBatch(
+        engine: str,
+        params: Tuple,
+        seed: int,
+        max_attempts: int,
+        max_shortfall: int,
+        first: int,
+        count: int
+    ) -> List[Tuple[bytes, Dict[str, Any]]]:
+
+    """
+    Generate a run of maps inside a worker process. Each map is retried until it is
+    clearable and short of at most max_shortfall seekers, or max_attempts is reached.
+
+    Args:
+        engine (str): The generator engine.
+        params (Tuple): The generator parameters.
+        seed (int): Seed of the whole bake.
+        max_attempts (int): Attempts per map before the last one is kept anyway.
+        max_shortfall (int): Seekers a vetted map may be missing.
+        first (int): Number of the first map.
+        count (int): Number of maps.
+
+    Returns:
+        List[Tuple[bytes, Dict[str, Any]]]: The pack record and the stats of every map,
+        with the generator's telemetry of each attempt.
+    """
+    results = []
+    for number in range(first, first + count):
+        # Every map has its own seed stream, so the bake does not depend on how maps are split across workers
+        generator = makeGenerator(engine, params, f'{seed}:{number}')
+        generation_time = 0.0
+        telemetry = []
+        for attempt in range(1, max_attempts + 1):
+            started = time.perf_counter()
+            generator.generateMap()
+            grid = generator.map
+            seekers = grid.count(SEEKER)
+            shortfall = max(0, generator.seekers - seekers)
+            clearable = generator.isMapClearable(grid.find(START)[0], grid.find(END)[0], generator.getAssetPositions())
+            generation_time += time.perf_counter() - started
+            telemetry.append(dict(generator.stats, map=number, attempt=attempt, clearable=clearable))
+            if clearable and shortfall <= max_shortfall:
+                break
+
+        stats = {
+            'seed': generator.seed,
+            'attempts': attempt,
+            'generation_time': generation_time,
+            'seekers': seekers,
+            'shortfall': shortfall,
+            'clearable': clearable,
+            'telemetry': telemetry
+        }
+        results.append((packRecord(grid, generator.seed, attempt, seekers, shortfall, clearable, generation_time), stats))
+    return results
+
+
+def summarise(stats: List[Dict[str, Any]], max_shortfall: int) -> Dict[str, Any]:
+    """
+    Aggregate the per-map stats of a bake.
+
+    Args:
+        stats (List[Dict[str, Any]]): The stats of every map.
+        max_shortfall (int): Seekers a vetted map may be missing.
+
+    Returns:
+        dict: Totals, attempt and timing figures, the seeker shortfall histogram, and the
+        time spent in each generation phase and the seeker rejections summed over every attempt.
+    """
+    times = sorted(map_stats['generation_time'] for map_stats in stats)
+    shortfalls: Dict[int, int] = {}
+    phases: Dict[str, float] = {}
+    rejections: Dict[str, int] = {}
+    for map_stats in stats:
+        shortfalls[map_stats['shortfall']] = shortfalls.get(map_stats['shortfall'], 0) + 1
+        for attempt in map_stats['telemetry']:
+            for phase, seconds in attempt['phases'].items():
+                phases[phase] = phases.get(phase, 0.0) + seconds
+            for reason, number in attempt['rejections'].items():
+                rejections[reason] = rejections.get(reason, 0) + number
+
+    return {
+        'maps': len(stats),
+        'vetted': sum(map_stats['clearable'] and map_stats['shortfall'] <= max_shortfall for map_stats in stats),
+        'unclearable': sum(not map_stats['clearable'] for map_stats in stats),
+        'attempts': sum(map_stats['attempts'] for map_stats in stats),
+        'max_attempts': max((map_stats['attempts'] for map_stats in stats), default=0),
+        'mean_generation_time': statistics.mean(times) if times else 0.0,
+        'p95_generation_time': times[int(len(times) * 0.95)] if times else 0.0,
+        'max_generation_time': times[-1] if times else 0.0,
+        'shortfall_histogram': {str(shortfall): number for shortfall, number in sorted(shortfalls.items())},
+        'phase_time': phases,
+        'seeker_rejections': rejections
+    }
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Generate maps in parallel into sharded, indexed pack files.')
+    parser.add_argument('count', type=int, help='number of maps to generate')
+    parser.add_argument('--output', type=Path, required=True, help='directory the packs and index.json are written to')
+    parser.add_argument('--engine', choices=ENGINES, default='vector', help='map generator, default vector')
+    parser.add_argument('--width', type=int, default=68)
+    parser.add_argument('--height', type=int, default=15)
+    parser.add_argument('--seekers', type=int, default=10)
+    parser.add_argument('--coins', type=int, default=10)
+    parser.add_argument('--density', type=float, help="open cell density, or the loop density of mazes, defaults to the engine's")
+    parser.add_argument('--tile-size', type=int, nargs=2, metavar=('WIDTH', 'HEIGHT'), help='prove maps winnable past the seekers at this tile size in pixels')
+    parser.add_argument('--seed', type=int, default=0, help='seed of the bake, the same seed and options give the same packs')
+    parser.add_argument('--shard-size', type=positiveInt, default=10000, help='maps per pack file')
+    parser.add_argument('--max-attempts', type=positiveInt, default=10, help='attempts per map before the last one is kept anyway')
+    parser.add_argument('--max-shortfall', type=int, default=0, help='seekers a vetted map may be missing')
+    parser.add_argument('--workers', type=positiveInt, default=os.cpu_count(), help='worker processes, default one per core')
+    parser.add_argument('--telemetry', type=Path, help='append the generator stats of every attempt to this JSON-lines file')
+    args = parser.parse_args()
+
+    density = args.density
+    if density is None:
+        density = (MazeGenerator if args.engine in (BACKTRACKER, ELLER) else MapGenerator)().density
+    tile_size = None if args.tile_size is None else tuple(args.tile_size)
+    params = (args.width, args.height, args.seekers, args.coins, density, tile_size)
+
+    args.output.mkdir(parents=True, exist_ok=True)
+    bake = partial(bakeBatch, args.engine, params, args.seed, args.max_attempts, args.max_shortfall)
+    firsts = range(0, args.count, BATCH_SIZE)
+    counts = [min(BATCH_SIZE, args.count - first) for first in firsts]
+
+    shards: List[Dict[str, Any]] = []
+    stats: List[Dict[str, Any]] = []
+    writer: Optional[PackWriter] = None
+    telemetry = None if args.telemetry is None else open(args.telemetry, 'a')
+    started = time.perf_counter()
+
+    # Batches come back in order, so map n is always record n % shard_size of shard n // shard_size
+    with ProcessPoolExecutor(max_workers=args.workers) as executor:
+        for results in executor.map(bake, firsts, counts):
+            for record, map_stats in results:
+                if writer is None:
+                    name = f'maps-{len(shards):05}.pack'
+                    writer = PackWriter(args.output / name)
+                    shards.append({'file': name, 'first': len(stats), 'count': 0})
+
+                writer.add(record)
+                shards[-1]['count'] += 1
+                stats.append(map_stats)
+                if telemetry is not None:
+                    telemetry.writelines(json.dumps(attempt) + '\n' for attempt in map_stats['telemetry'])
+
+                if shards[-1]['count'] == args.shard_size:
+                    writer.close()
+                    writer = None
+
+            elapsed = time.perf_counter() - started
+            print(f"{len(stats)}/{args.count} maps  {len(stats) / elapsed:8.1f} maps/s", end='\r', flush=True)
+
+    if writer is not None:
+        writer.close()
+    if telemetry is not None:
+        telemetry.close()
+    print()
+
+    summary = summarise(stats, args.max_shortfall)
+    index = {
+        'engine': args.engine,
+        'params': {
+            'width': args.width,
+            'height': args.height,
+            'seekers': args.seekers,
+            'collectibles': args.coins,
+            'density': density,
+            'tile_size': tile_size
+        },
+        'seed': args.seed,
+        'max_attempts': args.max_attempts,
+        'max_shortfall': args.max_shortfall,
+        'count': len(stats),
+        'shards': shards,
+        'elapsed': time.perf_counter() - started,
+        'stats': summary
+    }
+    (args.output / 'index.json').write_text(json.dumps(index, indent=2))
+
+    print(
+        f"{summary['vetted']} of {summary['maps']} maps vetted, {summary['unclearable']} unclearable, "
+        f"{summary['attempts']} attempts, mean {summary['mean_generation_time'] * 1e3:.2f} ms per map, "
+        f"{len(shards)} shards in {args.output}"
+    )
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -0,0 +1,385 @@
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import statistics
+import tempfile
+import subprocess
+from pathlib import Path
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+# Render off-screen, before pygame is imported anywhere
+os.environ.setdefault('SDL_VIDEODRIVER', 'dummy')
+os.environ.setdefault('SDL_AUDIODRIVER', 'dummy')
+
+import numpy as np
+import pygame
+
+sys.path.append(str(Path('src/generator/Model - 2').resolve()))
+from read_theme import read_theme
+from display import Display
+from draw_map import GameMap, WorldMap
+from generator import MapGenerator
+from vector_generator import VectorMapGenerator
+from seeker_solver import SeekerSolver
+from chunk_world import ChunkGenerator, ChunkWorld
+from maze_generator import MazeGenerator, BACKTRACKER, ELLER
+from map_pack import PackWriter, LevelPack, packRecord
+from simulation import GameState, newGame, updateSeekers, checkCollisions
+from tile_grid import START, END
+
+# Seeds every benchmark cycles through, so runs on different commits see the same maps
+SEEDS = list(range(16))
+
+# Generator parameters: width, height, seekers, collectibles and density
+MAP_SIZES = {
+    'default': (68, 15, 10, 10, 0.6),
+    'medium': (136, 30, 40, 40, 0.6),
+    'large': (272, 60, 160, 160, 0.6),
+    'huge': (544, 120, 640, 640, 0.6)
+}
+
+# Screen area the rendering benchmarks draw to
+SCREEN_SIZE = (1360, 760)
+
+
+class Benchmark:
+    def __init__(
+            self,
+            name: str,
+            function: Callable[[int], Any],
+            setup: Optional[Callable[[], None]] = None,
+            teardown: Optional[Callable[[], None]] = None
+        ) -> None:
+
+        """
+        Initialize a benchmark.
+
+        Args:
+            name (str): The name the result is stored under.
+            function (Callable): The code to time. It is called with the iteration number.
+            setup (Callable): Prepares the state function needs, run once before warm-up. Only benchmarks
+                that are run pay for it, so it may be shared and must not redo work already done.
+            teardown (Callable): Releases what setup made, e.g. temporary files, run once after timing.
+        """
+        self.name = name
+        self.function = function
+        self.setup = setup
+        self.teardown = teardown
+
+    def run(self, warmup: int, repeats: int, min_time: float) -> Dict[str, Any]:
+        """
+        Time the function in batches large enough to measure reliably.
+
+        Args:
+            warmup (int): Calls made before timing starts.
+            repeats (int): Number of timed batches.
+            min_time (float): Smallest duration of a batch in seconds.
+
+        Returns:
+            dict: Statistics of the time per call in seconds.
+        """
+        try:
+            if self.setup is not None:
+                self.setup()
+
+            iteration = 0
+            for _ in range(warmup):
+                self.function(iteration)
+                iteration += 1
+
+            # Calibrate the batch size on a single call
+            started = time.perf_counter()
+            self.function(iteration)
+            iteration += 1
+            number = max(1, int(min_time / max(time.perf_counter() - started, 1e-9)))
+
+            samples = []
+            for _ in range(repeats):
+                started = time.perf_counter()
+                for _ in range(number):
+                    self.function(iteration)
+                    iteration += 1
+                samples.append((time.perf_counter() - started) / number)
+        finally:
+            if self.teardown is not None:
+                self.teardown()
+
+        return {
+            'median': statistics.median(samples),
+            'mean': statistics.mean(samples),
+            'stdev': statistics.stdev(samples) if len(samples) > 1 else 0.0,
+            'min': min(samples),
+            'max': max(samples),
+            'repeats': repeats,
+            'number': number
+        }
+
+
+def generationBenchmarks() -> List[Benchmark]:
+    """
+    Benchmarks of map, maze and chunk generation and of isMapClearable across map sizes and entity counts.
+
+    Returns:
+        List[Benchmark]: The benchmarks.
+    """
+    benchmarks = []
+    for size, params in MAP_SIZES.items():
+        engines = [('vector', VectorMapGenerator)]
+        if size in ('default', 'medium'):
+            # The pure-Python engine takes seconds on the larger maps
+            engines.append(('python', MapGenerator))
+
+        for engine, generator_class in engines:
+            generator = generator_class(*params)
+            benchmarks.append(Benchmark(
+                f'generateMap[{engine},{size}]',
+                lambda i, generator=generator: generator.generateMap(SEEDS[i % len(SEEDS)])
+            ))
+
+        # Clearability is checked on fixed maps with their entities already found
+        maps = []
+
+        def prepare(params=params, maps=maps) -> None:
+            generator = VectorMapGenerator(*params)
+            for seed in SEEDS:
+                generator.generateMap(seed)
+                checker = MapGenerator(*params)
+                checker.map = generator.map
+                maps.append((checker, generator.map.find(START)[0], generator.map.find(END)[0], checker.getAssetPositions()))
+
+        def clearable(i: int, maps=maps) -> None:
+            checker, start, end, assets = maps[i % len(maps)]
+            checker.isMapClearable(start, end, assets)
+
+        benchmarks.append(Benchmark(f'isMapClearable[{size}]', clearable, prepare))
+
+    # The seeker solver on the default maps at the tile size of the default window
+    grids = []
+
+    def generateGrids() -> None:
+        generator = VectorMapGenerator(*MAP_SIZES['default'])
+        for seed in SEEDS:
+            generator.generateMap(seed)
+            grids.append(generator.map)
+
+    benchmarks.append(Benchmark(
+        'SeekerSolver.solve[default]',
+        lambda i: SeekerSolver(grids[i % len(grids)], (20, 50)).solve(),
+        generateGrids
+    ))
+
+    # Perfect mazes from both engines, at the default size and at a million cells
+    for algorithm in (BACKTRACKER, ELLER):
+        for size, (width, height) in (('default', (69, 15)), ('1001x1001', (1001, 1001))):
+            maze = MazeGenerator(width, height, 10, 10, algorithm=algorithm)
+            benchmarks.append(Benchmark(
+                f'generateMap[maze-{algorithm},{size}]',
+                lambda i, maze=maze: maze.generateMap(SEEDS[i % len(SEEDS)])
+            ))
+
+    # Chunks of the endless world, each from its own coordinates
+    chunk_generator = ChunkGenerator(seed=SEEDS[0])
+    benchmarks.append(Benchmark('generateChunk', lambda i: chunk_generator.generateChunk(i % 64, i // 64)))
+
+    # Random access into a pack of 10000 levels, each read without parsing the others
+    packs: List[LevelPack] = []
+    directories: List[tempfile.TemporaryDirectory] = []
+
+    def bakePack() -> None:
+        generator = VectorMapGenerator(*MAP_SIZES['default'])
+        directories.append(tempfile.TemporaryDirectory())
+        path = Path(directories[0].name) / 'levels.pack'
+        with PackWriter(path) as writer:
+            for seed in SEEDS:
+                generator.generateMap(seed)
+                record = packRecord(generator.map, seed, 1, 10, 0, True, 0.0)
+                for _ in range(10000 // len(SEEDS)):
+                    writer.add(record)
+        packs.append(LevelPack(path))
+
+    def removePack() -> None:
+        if packs:
+            packs.pop().close()
+        if directories:
+            directories.pop().cleanup()
+
+    benchmarks.append(Benchmark('LevelPack.grid', lambda i: packs[0].grid(i * 7919 % len(packs[0])), bakePack, removePack))
+
+    # Entity counts on a fixed map size
+    for seekers, coins in ((0, 0), (100, 100), (400, 1000)):
+        generator = VectorMapGenerator(272, 60, seekers, coins, 0.6)
+        benchmarks.append(Benchmark(
+            f'generateMap[vector,272x60,{seekers}s,{coins}c]',
+            lambda i, generator=generator: generator.generateMap(SEEDS[i % len(SEEDS)])
+        ))
+
+    return benchmarks
+
+
+def simulationBenchmarks() -> List[Benchmark]:
+    """
+    Benchmarks of the seeker update and the collision checks, with few and many seekers.
+
+    Returns:
+        List[Benchmark]: The benchmarks.
+    """
+    benchmarks = []
+    for size in ('default', 'huge'):
+        states: List[GameState] = []
+
+        def newState(size=size, states=states) -> None:
+            if not states:
+                generator = VectorMapGenerator(*MAP_SIZES[size])
+                generator.generateMap(SEEDS[0])
+                states.append(newGame(generator.map, 20, 50))
+
+        # The player stays on the start, so no coin is ever collected and only the seekers move
+        benchmarks.append(Benchmark(f'updateSeekers[{size}]', lambda i, states=states: updateSeekers(states[0]), newState))
+        benchmarks.append(Benchmark(f'checkCollisions[{size}]', lambda i, states=states: checkCollisions(states[0]), newState))
+
+    return benchmarks
+
+
+def renderingBenchmarks(theme: Dict[str, Any]) -> List[Benchmark]:
+    """
+    Benchmarks of GameMap.drawGrid, WorldMap.drawWorld, Display.drawTaskbar and Display.showWinScreen.
+
+    Args:
+        theme (dict): The game's theme.
+
+    Returns:
+        List[Benchmark]: The benchmarks.
+    """
+    scene: Dict[str, Any] = {}
+
+    def prepare() -> None:
+        if scene:
+            return
+        generator = VectorMapGenerator(*MAP_SIZES['default'])
+        generator.generateMap(SEEDS[0])
+        grid = generator.map
+        x_size, y_size = SCREEN_SIZE[0] / grid.width, SCREEN_SIZE[1] / grid.height
+
+        scene['grid'] = grid
+        scene['display'] = Display(SCREEN_SIZE[0], SCREEN_SIZE[1], x_size, y_size, theme)
+        scene['game_map'] = GameMap(grid, x_size, y_size, theme)
+        scene['state'] = newGame(grid, int(x_size), int(y_size))
+
+        # The endless world scrolling one tile to the right every frame, rendering chunks as they come into view
+        scene['world'] = ChunkWorld(ChunkGenerator(seed=SEEDS[0]))
+        scene['world_map'] = WorldMap(scene['world'], int(y_size), int(y_size), theme)
+
+    def draw(i: int, full: bool) -> None:
+        state: GameState = scene['state']
+        updateSeekers(state)
+        scene['game_map'].drawGrid(scene['display'].screen, state.player, state.seekers, state.radius + i % 8, full)
+
+    def drawWorld(i: int) -> None:
+        scene['world'].evict(*scene['world'].chunkOf(i, 0))
+        scene['world_map'].drawWorld(scene['display'].screen, (i, 0), [], 10)
+
+    def uncachedTaskbar(i: int) -> None:
+        scene['display'].drawTaskbar(i, i, f'{i // 60 % 60:02}:{i % 60:02}')
+
+    def winScreen(i: int) -> None:
+        scene['display'].showWinScreen(scene['grid'].width, scene['grid'].height, 2, '01:23', 5)
+
+    return [
+        Benchmark('drawGrid[full]', lambda i: draw(i, True), prepare),
+        Benchmark('drawGrid[dirty]', lambda i: draw(i, False), prepare),
+        Benchmark('drawWorld[scrolling]', drawWorld, prepare),
+        Benchmark('drawTaskbar[unchanged]', lambda i: scene['display'].drawTaskbar(3, 1, '01:23'), prepare),
+        Benchmark('drawTaskbar[changed]', uncachedTaskbar, prepare),
+        Benchmark('showWinScreen', winScreen, prepare)
+    ]
+
+
+def environment() -> Dict[str, Any]:
+    """
+    Describe the machine and code the results were measured on.
+
+    Returns:
+        dict: Versions, platform and git commit.
+    """
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        commit = None
+
+    return {
+        'commit': commit,
+        'time': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        'python': platform.python_version(),
+        'numpy': np.__version__,
+        'pygame': pygame.version.ver,
+        'platform': platform.platform(),
+        'processor': platform.processor()
+    }
+
+
+def compare(results: Dict[str, Any], baseline: Dict[str, Any], threshold: float) -> List[Tuple[str, float]]:
+    """
+    Find the benchmarks whose median time grew by more than threshold over a baseline run.
+
+    Args:
+        results (dict): The current run.
+        baseline (dict): The run to compare against.
+        threshold (float): Allowed slowdown, e.g. 0.1 for 10%.
+
+    Returns:
+        List[Tuple[str, float]]: The name and slowdown ratio of every regressed benchmark.
+    """
+    regressions = []
+    for name, result in results['benchmarks'].items():
+        if name not in baseline['benchmarks']:
+            continue
+        ratio = result['median'] / baseline['benchmarks'][name]['median']
+        print(f"{name:<45} {baseline['benchmarks'][name]['median'] * 1e3:10.4f} ms -> {result['median'] * 1e3:10.4f} ms  x{ratio:.2f}")
+        if ratio > 1 + threshold:
+            regressions.append((name, ratio))
+    return regressions
+
+
+def main() -> int:
+    parser = argparse.ArgumentParser(description='Benchmark map generation, simulation and rendering headlessly.')
+    parser.add_argument('--output', type=Path, help='write the results to this JSON file')
+    parser.add_argument('--compare', type=Path, help='JSON results of an earlier run to check for regressions against')
+    parser.add_argument('--threshold', type=float, default=0.1, help='slowdown that counts as a regression, default 0.1 (10%%)')
+    parser.add_argument('--filter', default='', help='only run benchmarks whose name contains this text')
+    parser.add_argument('--warmup', type=int, default=3, help='untimed calls before each benchmark')
+    parser.add_argument('--repeats', type=int, default=7, help='timed batches per benchmark')
+    parser.add_argument('--min-time', type=float, default=0.05, help='shortest batch in seconds')
+    args = parser.parse_args()
+
+    pygame.init()
+    theme = read_theme(Path('src') / 'theme.json')
+    benchmarks = generationBenchmarks() + simulationBenchmarks() + renderingBenchmarks(theme)
+
+    results: Dict[str, Any] = {'environment': environment(), 'benchmarks': {}}
+    for benchmark in benchmarks:
+        if args.filter.lower() not in benchmark.name.lower():
+            continue
+        result = benchmark.run(args.warmup, args.repeats, args.min_time)
+        results['benchmarks'][benchmark.name] = result
+        print(f"{benchmark.name:<45} median {result['median'] * 1e3:10.4f} ms  stdev {result['stdev'] * 1e3:8.4f} ms  ({result['repeats']} x {result['number']})")
+
+    pygame.quit()
+
+    if args.output is not None:
+        args.output.write_text(json.dumps(results, indent=2))
+
+    if args.compare is not None:
+        regressions = compare(results, json.loads(args.compare.read_text()), args.threshold)
+        if regressions:
+            for name, ratio in regressions:
+                print(f"REGRESSION {name}: {ratio:.2f}x slower")
+            return 1
+
+    return 0
+
+
+if __name__ == '__main__':
+    sys.exit(main())
@@ -4,6 +4,9 @@ import json
 import os
 import ctypes
 
+sys.path.append(os.path.join(os.path.dirname(os.path.abspath(__file__)), 'generator', 'Model - 2'))
+from map_pack import LevelPack
+
 # Constants for colors and other settings
 WALL_COLOR = (102, 113, 126)
 SEEKER_COLOR = (255, 255, 0)
@@ -29,6 +32,16 @@ def read_grid(filename):
         grid = [list(line.strip()) for line in file.readlines()]
     return grid
 
+# Function to read a level of a pack into a grid of characters, only that level is read
+def read_level(pack, index):
+    return [list(bytes(row).decode('ascii')) for row in pack.rows(index)]
+
+# Function to read a stage from the level pack, or from its text file when there is no pack
+def read_stage(stages, index):
+    if isinstance(stages, LevelPack):
+        return read_level(stages, index)
+    return read_grid(stages[index])
+
 # Function to draw the grid and game objects
 def draw_grid(screen, grid, player_pos, seeker_positions, circle_radius, x_size, y_size):
     rows = len(grid)
@@ -70,12 +83,16 @@ pygame.init()
 pygame.font.init()
 font = pygame.font.Font(None, 74)
 
-# Define stages and initialize variables
-stages = ['stage_1.txt', 'stage_2.txt', 'stage_3.txt']
+# Open the stages as a memory-mapped level pack, falling back to the text stages it is built from, and initialize variables
+pack_path = os.path.join('maps', 'campaign.pack')
+if os.path.exists(pack_path):
+    stages = LevelPack(pack_path)
+else:
+    stages = [os.path.join('maps', name) for name in ('stage_1.txt', 'stage_2.txt', 'stage_3.txt')]
 current_stage = 0
 
 # Calculate tile sizes based on screen dimensions and grid size
-grid = read_grid('maps\\' + stages[current_stage])
+grid = read_stage(stages, current_stage)
 rows, cols = len(grid), len(grid[0])
 
 user32 = ctypes.windll.user32
@@ -123,7 +140,7 @@ while running:
                 if event.key == pygame.K_SPACE and not all_levels_cleared:
                     current_stage += 1
                     if current_stage < len(stages):
-                        grid = read_grid('maps\\' + stages[current_stage])
+                        grid = read_stage(stages, current_stage)
                         rows, cols = len(grid), len(grid[0])
                         x_size = screen_width / cols
                         y_size = screen_height / rows
@@ -172,7 +189,7 @@ while running:
                     if event.key == pygame.K_SPACE and not all_levels_cleared:
                         current_stage += 1
                         if current_stage < len(stages):
-                            grid = read_grid('maps\\' + stages[current_stage])
+                            grid = read_stage(stages, current_stage)
                             rows, cols = len(grid), len(grid[0])
                             x_size = screen_width / cols
                             y_size = screen_height / rows
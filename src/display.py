@@ -1,7 +1,9 @@
 import pygame
 import json
-from typing import Dict
+from collections import OrderedDict
+from typing import Dict, List, Optional, Tuple
 import os
+from asset_manager import AssetManager
 
 
 class Display:
@@ -39,12 +41,31 @@ class Display:
         self.screen = pygame.display.set_mode((self.screen_width, self.screen_height), pygame.FULLSCREEN)
         pygame.display.set_caption('Sneak')
         
+        # Fonts are created once and shared, rendered text is memoized
+        self.fonts: Dict[Tuple[Optional[str], int], pygame.font.Font] = {}
+        self.text_cache: OrderedDict = OrderedDict()
+        self.text_cache_size = 64
+
         # Load font with scaled size
-        self.font = pygame.font.Font(None, self.win_screen_font_size)
+        self.font = self.getFont(None, self.win_screen_font_size)
+        self.taskbar_font = self.getFont(None, self.taskbar_font_size)
         self.theme = theme
 
-        # Preload and resize images once
+        # Taskbar surface and the values it currently shows
+        self.taskbar_surface: pygame.Surface = None
+        self.taskbar_values: Tuple[int, int, str] = None
+
+        # Performance overlay surface and the table it currently shows
+        self.overlay_surface: pygame.Surface = None
+        self.overlay_rows: List[List[str]] = None
+
+        # Preload and resize images once, for the taskbar and the win screen
+        self.assets = AssetManager('src')
+        self.icon_names = ['coin.jpg', 'seeker.jpg', 'clock.jpg']
         self.image_size = 40
+        self.win_image_size = int(self.screen_height * 0.1)
+        self.assets.buildAtlas(self.icon_names, self.image_size)
+        self.assets.buildAtlas(self.icon_names, self.win_image_size)
         self.coin_image = self.load_image('coin.jpg', self.image_size)
         self.seeker_image = self.load_image('seeker.jpg', self.image_size)
         self.clock_image = self.load_image('clock.jpg', self.image_size)
@@ -60,9 +81,46 @@ class Display:
         Returns:
             pygame.Surface: The scaled image surface.
         """
-        image_path = os.path.join('src', image_name)
-        image = pygame.image.load(image_path)
-        return pygame.transform.scale(image, (size, size))
+        return self.assets.getImage(image_name, size)
+
+    def getFont(self, family: Optional[str], size: int) -> pygame.font.Font:
+        """
+        Get a font from the registry, creating it on first use.
+
+        Args:
+            family (str): The system font family, or None for the default font.
+            size (int): The font size.
+
+        Returns:
+            pygame.font.Font: The shared font object.
+        """
+        key = (family, size)
+        if key not in self.fonts:
+            self.fonts[key] = pygame.font.SysFont(family, size) if family else pygame.font.Font(None, size)
+        return self.fonts[key]
+
+    def renderText(self, font: pygame.font.Font, text: str, color: Tuple[int, int, int]) -> pygame.Surface:
+        """
+        Render antialiased text, reusing the surface if the same text was rendered recently.
+
+        Args:
+            font (pygame.font.Font): The font to render with.
+            text (str): The text to render.
+            color (tuple): The text color.
+
+        Returns:
+            pygame.Surface: The rendered text.
+        """
+        key = (font, text, tuple(color))
+        surface = self.text_cache.get(key)
+        if surface is None:
+            surface = font.render(text, True, color)
+            self.text_cache[key] = surface
+            if len(self.text_cache) > self.text_cache_size:
+                self.text_cache.popitem(last=False)
+        else:
+            self.text_cache.move_to_end(key)
+        return surface
 
     def updateScreenSize(
             self,
@@ -81,7 +139,7 @@ class Display:
             pygame.FULLSCREEN
         )
 
-    def drawTaskbar(self, coins: int, collisions: int, stopwatch: str) -> None:
+    def drawTaskbar(self, coins: int, collisions: int, stopwatch: str) -> pygame.Rect:
         """
         Draw the taskbar with current game statistics and images.
 
@@ -89,30 +147,84 @@ class Display:
             coins (int): The number of coins collected.
             collisions (int): The number of seeker collisions.
             stopwatch (str): The elapsed time formatted as a string.
+
+        Returns:
+            pygame.Rect: The screen area covered by the taskbar.
         """
-        # Draw the taskbar background
         taskbar_rect = pygame.Rect(0, 0, self.screen_width, self.taskbar_height)
-        pygame.draw.rect(self.screen, self.taskbar_color, taskbar_rect)
+
+        # Only re-render the taskbar when one of the displayed values changed
+        if self.taskbar_surface is None or self.taskbar_values != (coins, collisions, stopwatch):
+            self.renderTaskbar(coins, collisions, stopwatch)
+
+        self.screen.blit(self.taskbar_surface, taskbar_rect)
+
+        return taskbar_rect
+
+    def renderTaskbar(self, coins: int, collisions: int, stopwatch: str) -> None:
+        """
+        Render the taskbar with the given statistics into the cached taskbar surface.
+
+        Args:
+            coins (int): The number of coins collected.
+            collisions (int): The number of seeker collisions.
+            stopwatch (str): The elapsed time formatted as a string.
+        """
+        self.taskbar_surface = pygame.Surface((self.screen_width, self.taskbar_height))
+        self.taskbar_values = (coins, collisions, stopwatch)
+
+        # Draw the taskbar background
+        self.taskbar_surface.fill(self.taskbar_color)
 
         # Font for taskbar text
-        font = pygame.font.SysFont(None, self.taskbar_font_size)
+        font = self.taskbar_font
         text_color = (255, 255, 255)
 
         # Render the number of coins with image
-        coins_text = font.render(f'Coins: {coins}', True, text_color)
-        self.screen.blit(self.coin_image, (10, 10))
-        self.screen.blit(coins_text, (10 + self.image_size + 10, 10))
+        coins_text = self.renderText(font, f'Coins: {coins}', text_color)
+        self.taskbar_surface.blit(self.coin_image, (10, 10))
+        self.taskbar_surface.blit(coins_text, (10 + self.image_size + 10, 10))
 
         # Render the stopwatch with image
-        stopwatch_text = font.render(f'Time: {stopwatch}', True, text_color)
+        stopwatch_text = self.renderText(font, f'Time: {stopwatch}', text_color)
         stopwatch_width = stopwatch_text.get_width()
-        self.screen.blit(self.clock_image, (self.screen_width // 2 - stopwatch_width // 2 - self.image_size - 10, 10))
-        self.screen.blit(stopwatch_text, (self.screen_width // 2 - stopwatch_width // 2, 10))
+        self.taskbar_surface.blit(self.clock_image, (self.screen_width // 2 - stopwatch_width // 2 - self.image_size - 10, 10))
+        self.taskbar_surface.blit(stopwatch_text, (self.screen_width // 2 - stopwatch_width // 2, 10))
 
         # Render the number of seeker collisions with image
-        collisions_text = font.render(f'Collisions: {collisions}', True, text_color)
-        self.screen.blit(self.seeker_image, (self.screen_width - self.image_size - 10, 10))
-        self.screen.blit(collisions_text, (self.screen_width - collisions_text.get_width() - 10 - self.image_size - 10, 10))
+        collisions_text = self.renderText(font, f'Collisions: {collisions}', text_color)
+        self.taskbar_surface.blit(self.seeker_image, (self.screen_width - self.image_size - 10, 10))
+        self.taskbar_surface.blit(collisions_text, (self.screen_width - collisions_text.get_width() - 10 - self.image_size - 10, 10))
+
+    def drawOverlay(self, rows: List[List[str]]) -> pygame.Rect:
+        """
+        Draw a table of text on an opaque background below the taskbar.
+        The first column is aligned left and the others right.
+
+        Args:
+            rows (List[List[str]]): The cells of every row.
+
+        Returns:
+            pygame.Rect: The screen area covered by the overlay.
+        """
+        # Only re-render the overlay when its text changed
+        if self.overlay_surface is None or self.overlay_rows != rows:
+            font = self.getFont(None, 24)
+            cells = [[font.render(cell, True, (255, 255, 255)) for cell in row] for row in rows]
+            widths = [max(row[column].get_width() for row in cells) + 20 for column in range(len(cells[0]))]
+            line_height = font.get_linesize()
+
+            self.overlay_surface = pygame.Surface((sum(widths), line_height * len(cells) + 20))
+            self.overlay_surface.fill((0, 0, 0))
+            for y, row in enumerate(cells):
+                x = 10
+                for column, text in enumerate(row):
+                    offset = 0 if column == 0 else widths[column] - 20 - text.get_width()
+                    self.overlay_surface.blit(text, (x + offset, 10 + y * line_height))
+                    x += widths[column]
+            self.overlay_rows = rows
+
+        return self.screen.blit(self.overlay_surface, (10, self.taskbar_height + 10))
 
     def showWinScreen(
         self,
@@ -132,11 +244,11 @@ class Display:
             time_taken (str): The time taken to complete the level.
             coins_collected (int): The number of coins collected by the player.
         """
-        # Resize images for win screen
-        win_image_size = int(self.screen_height * 0.1)
-        self.coin_image = self.load_image('coin.jpg', win_image_size)
-        self.seeker_image = self.load_image('seeker.jpg', win_image_size)
-        self.clock_image = self.load_image('clock.jpg', win_image_size)
+        # Images at win screen size, already scaled by the asset manager
+        win_image_size = self.win_image_size
+        coin_image = self.load_image('coin.jpg', win_image_size)
+        seeker_image = self.load_image('seeker.jpg', win_image_size)
+        clock_image = self.load_image('clock.jpg', win_image_size)
 
         # Win Messages
         win_text = "YOU WON"
@@ -146,14 +258,14 @@ class Display:
         exit_text = "Press SPACE to continue or ESC to exit"
 
         # Font for the win screen
-        font = pygame.font.Font(None, self.win_screen_font_size)
+        font = self.font
 
         # Render win messages
-        win_surface = font.render(win_text, True, self.theme['START_COLOR'])
-        collisions_surface = font.render(collisions_text, True, self.theme['SEEKER_COLOR'])
-        time_surface = font.render(time_text, True, self.theme['END_COLOR'])
-        coins_surface = font.render(coins_text, True, self.theme['COIN_COLOR'])
-        exit_surface = font.render(exit_text, True, self.theme['START_COLOR'])
+        win_surface = self.renderText(font, win_text, self.theme['START_COLOR'])
+        collisions_surface = self.renderText(font, collisions_text, self.theme['SEEKER_COLOR'])
+        time_surface = self.renderText(font, time_text, self.theme['END_COLOR'])
+        coins_surface = self.renderText(font, coins_text, self.theme['COIN_COLOR'])
+        exit_surface = self.renderText(font, exit_text, self.theme['START_COLOR'])
 
         # Calculate positions
         center_x_position = self.screen_width // 2
@@ -176,21 +288,46 @@ class Display:
         stats_spacing = int(self.screen_height * 0.1)
 
         # Display seeker image and collisions text
-        self.screen.blit(self.seeker_image, (left_offset - win_image_size - 10, stats_start_y_position))
+        self.screen.blit(seeker_image, (left_offset - win_image_size - 10, stats_start_y_position))
         self.screen.blit(collisions_surface, (left_offset, stats_start_y_position))
 
         # Display clock image and time text
-        self.screen.blit(self.clock_image, (left_offset - win_image_size - 10,
-                                            stats_start_y_position + stats_spacing))
+        self.screen.blit(clock_image, (left_offset - win_image_size - 10,
+                                       stats_start_y_position + stats_spacing))
         self.screen.blit(time_surface, (left_offset, stats_start_y_position + stats_spacing))
 
         # Display coin image and coins text
-        self.screen.blit(self.coin_image, (left_offset - win_image_size - 10,
-                                           stats_start_y_position + 2 * stats_spacing))
+        self.screen.blit(coin_image, (left_offset - win_image_size - 10,
+                                      stats_start_y_position + 2 * stats_spacing))
         self.screen.blit(coins_surface, (left_offset, stats_start_y_position + 2 * stats_spacing))
 
-        # Resizing the image for the taskbar
-        win_image_size = 40
-        self.coin_image = self.load_image('coin.jpg', win_image_size)
-        self.seeker_image = self.load_image('seeker.jpg', win_image_size)
-        self.clock_image = self.load_image('clock.jpg', win_image_size)
+    def showLoadingScreen(self, progress: float, phase: str) -> None:
+        """
+        Display the progress of a map being generated.
+
+        Args:
+            progress (float): How much of the map is done, from 0 to 1.
+            phase (str): The generation phase being worked on.
+        """
+        self.screen.fill(self.theme['BACKGROUND_COLOR'])
+
+        center_x_position = self.screen_width // 2
+        center_y_position = self.screen_height // 2
+
+        # Loading message with the current phase, and how to cancel
+        loading_surface = self.renderText(self.font, f"Generating map: {phase}", self.theme['TEXT_COLOR'])
+        cancel_surface = self.renderText(self.taskbar_font, "Press ESC to cancel", self.theme['TEXT_COLOR'])
+        self.screen.blit(loading_surface, (center_x_position - loading_surface.get_width() // 2,
+                                           center_y_position - loading_surface.get_height() - 40))
+
+        # Progress bar
+        bar_width = self.screen_width // 2
+        bar_height = int(self.screen_height * 0.04)
+        bar_rect = pygame.Rect(center_x_position - bar_width // 2, center_y_position, bar_width, bar_height)
+        pygame.draw.rect(self.screen, self.theme['TEXT_COLOR'], bar_rect, 2)
+        filled_rect = bar_rect.inflate(-8, -8)
+        filled_rect.width = int(filled_rect.width * max(0.0, min(progress, 1.0)))
+        pygame.draw.rect(self.screen, self.theme['START_COLOR'], filled_rect)
+
+        self.screen.blit(cancel_surface, (center_x_position - cancel_surface.get_width() // 2,
+                                          center_y_position + bar_height + 20))
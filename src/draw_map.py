@@ -1,11 +1,13 @@
 import pygame
 from typing import List, Tuple, Any, Dict
+from tile_grid import TileGrid, WALL, START, END, COIN
+from chunk_world import ChunkWorld
 
 class GameMap:
     
     def __init__ (
             self, 
-            grid: List[List[str]], 
+            grid: TileGrid, 
             x_size: float, 
             y_size: float, 
             theme: Dict[str, Any]
@@ -15,7 +17,7 @@ class GameMap:
         Initialize the GameMap class with the grid, tile sizes, and theme.
         
         Args:
-            grid (List[List[str]]): The game grid.
+            grid (TileGrid): The game grid.
             x_size (float): The width of each tile.
             y_size (float): The height of each tile.
             theme (dict): The theme dictionary containing colors and other UI elements.
@@ -24,156 +26,261 @@ class GameMap:
         self.x_size = x_size
         self.y_size = y_size
         self.theme = theme
-        self.seeker_positions: List[List[int]] = []
-        self.coin_positions: List[List[int]] = []
 
-        self.coins_collected = 0
-        self.seekers_collisions = 0
+        # Pre-rendered walls, start, end and coins, rebuilt when the map changes
+        self.tile_colors: Dict[int, Any] = {
+            WALL: theme['WALL_COLOR'],
+            START: theme['START_COLOR'],
+            END: theme['END_COLOR'],
+            COIN: theme['COIN_COLOR']
+        }
+        self.background: pygame.Surface = None
+        self.background_tile_size: Tuple[float, float] = None
 
+        # Screen areas drawn over last frame and tiles patched since, for dirty-rect presentation
+        self.previous_rects: List[pygame.Rect] = []
+        self.patched_rects: List[pygame.Rect] = []
 
-    def resetGame (
-            self
-        ) -> Tuple[List[int], List[List[int]], List[List[int]]]:
-        
+
+    @property
+    def grid(self) -> TileGrid:
+        return self._grid
+
+    @grid.setter
+    def grid(self, grid: TileGrid) -> None:
+        # A new map needs a new static layer
+        self._grid = grid
+        self.background = None
+
+    def tileRect(self, x: int, y: int) -> pygame.Rect:
         """
-        Reset the game by finding the player's start position, seekers' positions, and coin positions.
-        
+        Get the screen rectangle covered by a tile.
+
+        Args:
+            x (int): Column of the tile.
+            y (int): Row of the tile.
+
         Returns:
-            Tuple: Player's starting position, seekers' positions, and coin positions.
+            pygame.Rect: The tile's rectangle.
         """
-        
-        player_pos = None
-        self.seeker_positions = []
-        self.coin_positions = []
+        return pygame.Rect(x * self.x_size, y * self.y_size, self.x_size, self.y_size)
+
+    def renderBackground(self) -> None:
+        """
+        Render every static tile of the grid once into the cached background surface.
+        """
+        size = (int(self.grid.width * self.x_size) + 1, int(self.grid.height * self.y_size) + 1)
+        self.background = pygame.Surface(size)
+        if pygame.display.get_surface() is not None:
+            self.background = self.background.convert()
+        self.background.fill(self.theme['BACKGROUND_COLOR'])
+        self.background_tile_size = (self.x_size, self.y_size)
 
         for y, row in enumerate(self.grid):
             for x, cell in enumerate(row):
-                if cell == 'S':
-                    player_pos = [x, y]
-                elif cell == '$':
-                    self.seeker_positions.append([x, y, 1])
-                elif cell == 'C':
-                    self.coin_positions.append([x, y])
-        
-        return player_pos, self.seeker_positions, self.coin_positions
+                if cell in self.tile_colors:
+                    self.background.fill(self.tile_colors[cell], self.tileRect(x, y))
+
+    def patchTile(self, x: int, y: int) -> None:
+        """
+        Redraw a single tile of the cached background after it changed in the grid.
+
+        Args:
+            x (int): Column of the tile.
+            y (int): Row of the tile.
+        """
+        if self.background is None:
+            return
+
+        rect = self.tileRect(x, y)
+        self.background.fill(self.tile_colors.get(self.grid[y][x], self.theme['BACKGROUND_COLOR']), rect)
+        self.patched_rects.append(rect)
 
     def drawGrid (
             self, 
             screen: pygame.Surface, 
-            player_pos: List[int], 
-            seeker_positions: List[List[int]], 
-            coin_positions: List[List[int]], 
-            circle_radius: int
-        ) -> None:
+            player_pos: Tuple[float, float], 
+            seeker_positions: List[Tuple[float, float]], 
+            circle_radius: float,
+            full: bool = True
+        ) -> List[pygame.Rect]:
         
         """
-        Draw the grid, player, seekers, coins, and the player's circle on the screen.
+        Draw the grid, player, seekers, and the player's circle on the screen.
         
         Args:
             screen (pygame.Surface): The screen surface to draw on.
-            player_pos (List[int]): The player's position.
-            seeker_positions (List[List[int]]): The seekers' positions.
-            coin_positions (List[List[int]]): The coins' positions.
-            circle_radius (int): The radius of the player's circle.
+            player_pos (Tuple[float, float]): The player's position, in tiles. It may lie between two tiles.
+            seeker_positions (List[Tuple[float, float]]): The seekers' positions, in tiles.
+            circle_radius (float): The radius of the player's circle.
+            full (bool): Redraw the whole map instead of only the areas that changed since last frame.
+
+        Returns:
+            List[pygame.Rect]: The screen areas that changed and need to be presented.
         """
         
-        rows = len(self.grid)
-        cols = len(self.grid[0])
-        
-        for y, row in enumerate(self.grid):
-            for x, cell in enumerate(row):
-                rect = pygame.Rect(x * self.x_size, y * self.y_size, self.x_size, self.y_size)
-                if cell == '#':
-                    pygame.draw.rect(screen, self.theme['WALL_COLOR'], rect)
-                elif cell == 'S':
-                    pygame.draw.rect(screen, self.theme['START_COLOR'], rect)
-                elif cell == 'E':
-                    pygame.draw.rect(screen, self.theme['END_COLOR'], rect)
-                elif cell == 'C':
-                    pygame.draw.rect(screen, self.theme['COIN_COLOR'], rect)
+        # Static tiles come from the cached background
+        if self.background is None or self.background_tile_size != (self.x_size, self.y_size):
+            self.renderBackground()
+            full = True
+
+        if full:
+            screen.blit(self.background, (0, 0))
+            dirty_rects = [screen.get_rect()]
+        else:
+            # Erase last frame's entities and any patched tiles from the background
+            dirty_rects = self.previous_rects + self.patched_rects
+            for rect in dirty_rects:
+                screen.blit(self.background, rect, rect)
+        self.patched_rects = []
 
         player_rect = pygame.Rect(player_pos[0] * self.x_size, player_pos[1] * self.y_size, self.x_size, self.y_size)
-        pygame.draw.rect(screen, self.theme['START_COLOR'], player_rect)
+        drawn_rects = [pygame.draw.rect(screen, self.theme['START_COLOR'], player_rect)]
 
         for pos in seeker_positions:
             seeker_rect = pygame.Rect(pos[0] * self.x_size, pos[1] * self.y_size, self.x_size, self.y_size)
-            pygame.draw.rect(screen, self.theme['SEEKER_COLOR'], seeker_rect)
-
-        for pos in coin_positions:
-            coin_rect = pygame.Rect(pos[0] * self.x_size, pos[1] * self.y_size, self.x_size, self.y_size)
-            pygame.draw.rect(screen, self.theme['COIN_COLOR'], coin_rect)
+            drawn_rects.append(pygame.draw.rect(screen, self.theme['SEEKER_COLOR'], seeker_rect))
 
         circle_center = (player_pos[0] * self.x_size + self.x_size // 2, player_pos[1] * self.y_size + self.y_size // 2)
-        pygame.draw.circle(screen, self.theme['CIRCLE_COLOR'], circle_center, circle_radius, 3)
+        drawn_rects.append(pygame.draw.circle(screen, self.theme['CIRCLE_COLOR'], circle_center, circle_radius, 3))
 
-    def updateSeekers (
-            self
+        self.previous_rects = drawn_rects
+        return dirty_rects if full else dirty_rects + drawn_rects
+
+
+class WorldMap:
+
+    def __init__ (
+            self,
+            world: ChunkWorld,
+            x_size: int,
+            y_size: int,
+            theme: Dict[str, Any]
         ) -> None:
-        
+
         """
-        Update the positions of the seekers.
+        Initialize the WorldMap class, which draws an endless chunked world through a camera
+        centred on the player. Each chunk is rendered once into its own surface when it first
+        comes into view, and surfaces of chunks out of view are dropped.
+
+        Args:
+            world (ChunkWorld): The world to draw.
+            x_size (int): The width of each tile.
+            y_size (int): The height of each tile.
+            theme (dict): The theme dictionary containing colors and other UI elements.
         """
-        
-        for seeker in self.seeker_positions:
-        
-            x, y, direction = seeker
-            new_x = x + direction
-            
-            if new_x < 0 or new_x >= len(self.grid[0]) or self.grid[y][new_x] == '#':
-                direction *= -1
-            
-            else:
-                seeker[0] = new_x
-            seeker[2] = direction
-
-    def checkCollisions(
+        self.world = world
+        self.x_size = x_size
+        self.y_size = y_size
+        self.theme = theme
+
+        self.tile_colors: Dict[int, Any] = {
+            WALL: theme['WALL_COLOR'],
+            START: theme['START_COLOR'],
+            END: theme['END_COLOR'],
+            COIN: theme['COIN_COLOR']
+        }
+        self.chunk_size: Tuple[int, int] = (world.width * x_size, world.height * y_size)
+        self.surfaces: Dict[Tuple[int, int], pygame.Surface] = {}
+
+    def clear(self) -> None:
+        """
+        Drop every rendered chunk, after the world changed.
+        """
+        self.surfaces.clear()
+
+    def renderChunk(self, cx: int, cy: int) -> pygame.Surface:
+        """
+        Render the static tiles of a chunk into a new surface.
+
+        Args:
+            cx (int): Column of the chunk.
+            cy (int): Row of the chunk.
+
+        Returns:
+            pygame.Surface: The rendered chunk.
+        """
+        surface = pygame.Surface(self.chunk_size)
+        if pygame.display.get_surface() is not None:
+            surface = surface.convert()
+        surface.fill(self.theme['BACKGROUND_COLOR'])
+
+        for y, row in enumerate(self.world.chunk(cx, cy)):
+            for x, cell in enumerate(row):
+                if cell in self.tile_colors:
+                    surface.fill(self.tile_colors[cell], (x * self.x_size, y * self.y_size, self.x_size, self.y_size))
+        return surface
+
+    def patchTile(self, x: int, y: int) -> None:
+        """
+        Redraw a single tile of a rendered chunk after it changed in the world.
+
+        Args:
+            x (int): World column of the tile.
+            y (int): World row of the tile.
+        """
+        cx, cy = self.world.chunkOf(x, y)
+        surface = self.surfaces.get((cx, cy))
+        if surface is None:
+            return
+
+        color = self.tile_colors.get(self.world.tile(x, y), self.theme['BACKGROUND_COLOR'])
+        local_x, local_y = x - cx * self.world.width, y - cy * self.world.height
+        surface.fill(color, (local_x * self.x_size, local_y * self.y_size, self.x_size, self.y_size))
+
+    def drawWorld (
             self,
-            player_pos: List[int], 
-            seeker_positions: List[List[int]], 
-            circle_radius: int, 
-            x_size: float, 
-            y_size: float
-        ) -> Tuple[bool, bool]:
-        
+            screen: pygame.Surface,
+            player_pos: Tuple[float, float],
+            seeker_positions: List[Tuple[float, float]],
+            circle_radius: float
+        ) -> List[pygame.Rect]:
+
         """
-        Check for collisions between the player and the seekers, and if the player collects a coin.
-        
+        Draw the chunks in view, the player, the seekers in view and the player's circle,
+        with the camera centred on the player.
+
         Args:
-            player_pos (List[int]): The player's position.
-            seeker_positions (List[List[int]]): The seekers' positions.
-            circle_radius (int): The radius of the player's circle.
-            x_size (float): The width of each tile.
-            y_size (float): The height of each tile.
-        
+            screen (pygame.Surface): The screen surface to draw on.
+            player_pos (Tuple[float, float]): The player's position, in world tiles. It may lie between two tiles.
+            seeker_positions (List[Tuple[float, float]]): The seekers' positions, in world tiles.
+            circle_radius (float): The radius of the player's circle.
+
         Returns:
-            Tuple[bool, bool]: indicates collision with seekers, second boolean indicates collection of a coin.
+            List[pygame.Rect]: The screen areas that changed, always the whole screen as the camera moves.
         """
-        
-        seeker_collision = False
-        coin_collected = False
-        
-        # Check collision with seekers
-        for seeker in seeker_positions:
-            seeker_center = (seeker[0] * int(x_size) + int(x_size) // 2, seeker[1] * int(y_size) + int(y_size) // 2)
-            circle_center = (player_pos[0] * int(x_size) + int(x_size) // 2, player_pos[1] * int(y_size) + int(y_size) // 2)
-            distance = ((seeker_center[0] - circle_center[0]) ** 2 + (seeker_center[1] - circle_center[1]) ** 2) ** 0.5
-
-            if distance < circle_radius + int(x_size) // 2:
-                seeker_collision = True
-                self.seekers_collisions += 1
-                break
-        
-        # Check collection of coins
-        for coin in self.coin_positions:
-            coin_center = (coin[0] * int(x_size) + int(x_size) // 2, coin[1] * int(y_size) + int(y_size) // 2)
-            distance = ((coin_center[0] - circle_center[0]) ** 2 + (coin_center[1] - circle_center[1]) ** 2) ** 0.5
-
-            if distance < int(x_size) // 2:
-                coin_collected = True
-                self.grid[coin[1]][coin[0]] = ' '
-                self.coin_positions.remove(coin)
-                self.coins_collected += 1
-                print("coin")
-                break
-        
-        return seeker_collision, coin_collected
\ No newline at end of file
+        screen_rect = screen.get_rect()
+        chunk_width, chunk_height = self.chunk_size
+
+        # Top left corner of the view in world pixels
+        left = round(player_pos[0] * self.x_size + self.x_size / 2 - screen_rect.width / 2)
+        top = round(player_pos[1] * self.y_size + self.y_size / 2 - screen_rect.height / 2)
+
+        # Only the chunks overlapping the view are rendered
+        first_x, last_x = left // chunk_width, (left + screen_rect.width - 1) // chunk_width
+        first_y, last_y = top // chunk_height, (top + screen_rect.height - 1) // chunk_height
+        for cy in range(first_y, last_y + 1):
+            for cx in range(first_x, last_x + 1):
+                surface = self.surfaces.get((cx, cy))
+                if surface is None:
+                    surface = self.surfaces[(cx, cy)] = self.renderChunk(cx, cy)
+                screen.blit(surface, (cx * chunk_width - left, cy * chunk_height - top))
+
+        # Chunks more than one chunk out of view are dropped, so walking along an edge does not render them again and again
+        self.surfaces = {
+            (cx, cy): surface for (cx, cy), surface in self.surfaces.items()
+            if first_x - 1 <= cx <= last_x + 1 and first_y - 1 <= cy <= last_y + 1
+        }
+
+        player_rect = pygame.Rect(player_pos[0] * self.x_size - left, player_pos[1] * self.y_size - top, self.x_size, self.y_size)
+        pygame.draw.rect(screen, self.theme['START_COLOR'], player_rect)
+
+        for pos in seeker_positions:
+            seeker_rect = pygame.Rect(pos[0] * self.x_size - left, pos[1] * self.y_size - top, self.x_size, self.y_size)
+            if seeker_rect.colliderect(screen_rect):
+                pygame.draw.rect(screen, self.theme['SEEKER_COLOR'], seeker_rect)
+
+        circle_center = (player_rect.x + self.x_size // 2, player_rect.y + self.y_size // 2)
+        pygame.draw.circle(screen, self.theme['CIRCLE_COLOR'], circle_center, circle_radius, 3)
+
+        return [screen_rect]
@@ -0,0 +1,128 @@
+import os
+import struct
+import time
+from pathlib import Path
+from typing import List, Tuple
+
+# Event codes, the value recorded with each event is noted where it means something
+FRAME_GAMEPLAY = 1
+FRAME_WIN = 2
+TICK = 3                # simulation tick number
+SEEKER_COLLISION = 4    # collisions so far
+COIN_COLLECTED = 5      # y * 65536 + x of the coin
+GAME_WON = 6            # tick the level was won on
+NEW_MAP = 7
+MENU = 8
+OVERLAY_TOGGLED = 9     # 1 if shown
+EVENT_NAMES = {
+    FRAME_GAMEPLAY: 'frame_gameplay',
+    FRAME_WIN: 'frame_win',
+    TICK: 'tick',
+    SEEKER_COLLISION: 'seeker_collision',
+    COIN_COLLECTED: 'coin_collected',
+    GAME_WON: 'game_won',
+    NEW_MAP: 'new_map',
+    MENU: 'menu',
+    OVERLAY_TOGGLED: 'overlay_toggled'
+}
+
+# Dump layout: header, then the records from oldest to newest
+MAGIC = b'SNKF'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sBI')
+RECORD = struct.Struct('<QHxxi')
+
+# Dumps kept in a directory, the oldest are removed as new ones are written
+KEEP_DUMPS = 20
+
+
+class FlightRecorder:
+    def __init__(self, capacity: int = 65536) -> None:
+        """
+        Initialize the FlightRecorder, a fixed-size ring buffer of binary event records.
+        Each record holds a monotonic timestamp in nanoseconds, an event code and a value.
+
+        Args:
+            capacity (int): The number of records kept before the oldest are overwritten.
+        """
+        self.capacity = capacity
+        self.buffer = bytearray(capacity * RECORD.size)
+        self.index = 0
+        self.count = 0
+
+    def record(self, code: int, value: int = 0) -> None:
+        """
+        Append an event, overwriting the oldest one when the buffer is full.
+
+        Args:
+            code (int): The event code.
+            value (int): A number to keep with the event.
+        """
+        RECORD.pack_into(self.buffer, self.index * RECORD.size, time.monotonic_ns(), code, value)
+        self.index = (self.index + 1) % self.capacity
+        if self.count < self.capacity:
+            self.count += 1
+
+    def records(self) -> bytes:
+        """
+        Get the raw records from oldest to newest.
+
+        Returns:
+            bytes: The packed records.
+        """
+        if self.count < self.capacity:
+            return bytes(self.buffer[:self.count * RECORD.size])
+        split = self.index * RECORD.size
+        return bytes(self.buffer[split:] + self.buffer[:split])
+
+    def dump(self, directory: Path, reason: str, keep: int = KEEP_DUMPS) -> Path:
+        """
+        Write the buffer to a new file in the given directory, then remove all but the newest dumps there.
+
+        Args:
+            directory (Path): The directory the dump is written to.
+            reason (str): Why the dump was taken, e.g. crash, hotkey or exit. Used in the file name.
+            keep (int): The number of dumps kept in the directory, this one included.
+
+        Returns:
+            Path: The file written.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        path = directory / f"{time.strftime('%Y%m%d-%H%M%S')}-{os.getpid()}-{reason}.bin"
+        path.write_bytes(HEADER.pack(MAGIC, FORMAT_VERSION, self.count) + self.records())
+
+        # Names start with the time they were taken, so they sort oldest first
+        for old in sorted(directory.glob('*.bin'))[:-keep]:
+            old.unlink(missing_ok=True)
+        return path
+
+
+def readDump(path: Path) -> List[Tuple[int, str, int]]:
+    """
+    Decode a dump written by FlightRecorder.dump.
+
+    Args:
+        path (Path): The dump file.
+
+    Returns:
+        List[Tuple[int, str, int]]: The timestamp, event name and value of every record.
+    """
+    data = Path(path).read_bytes()
+    magic, version, count = HEADER.unpack_from(data)
+    if magic != MAGIC or version != FORMAT_VERSION:
+        raise ValueError(f"{path} is not a flight recorder dump")
+
+    return [
+        (timestamp, EVENT_NAMES.get(code, str(code)), value)
+        for timestamp, code, value in RECORD.iter_unpack(data[HEADER.size:HEADER.size + count * RECORD.size])
+    ]
+
+
+if __name__ == '__main__':
+    import sys
+
+    records = readDump(sys.argv[1])
+    start = records[0][0] if records else 0
+    for timestamp, name, value in records:
+        print(f"{(timestamp - start) / 1e6:12.3f} ms  {name:<18} {value}")
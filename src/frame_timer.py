@@ -0,0 +1,117 @@
+import json
+import numpy as np
+from pathlib import Path
+from time import perf_counter
+from typing import Dict, List
+
+# Phases of a frame, as column indices of the ring buffer. The last column is the whole frame.
+INPUT = 0
+UPDATE_SEEKERS = 1
+CHECK_COLLISIONS = 2
+DRAW_GRID = 3
+DRAW_TASKBAR = 4
+PRESENT = 5
+FRAME = 6
+COLUMNS = ('input', 'updateSeekers', 'checkCollisions', 'drawGrid', 'drawTaskbar', 'present', 'frame')
+PERCENTILES = (50, 95, 99)
+
+
+class FrameTimer:
+    def __init__(self, capacity: int = 2048) -> None:
+        """
+        Initialize the FrameTimer, which records how long each phase of the last
+        capacity frames took into a ring buffer allocated once up front.
+
+        Args:
+            capacity (int): The number of frames kept.
+        """
+        self.capacity = capacity
+        self.samples: np.ndarray = np.zeros((capacity, len(COLUMNS)))
+        self.index = 0
+        self.count = 0
+
+        # The frame being recorded
+        self.current: List[float] = [0.0] * len(COLUMNS)
+        self.frame_start = 0.0
+        self.mark = 0.0
+
+    def start(self) -> None:
+        """
+        Begin recording a new frame.
+        """
+        self.current = [0.0] * len(COLUMNS)
+        self.frame_start = self.mark = perf_counter()
+
+    def lap(self, phase: int) -> None:
+        """
+        Add the time since the last lap to a phase. Phases may lap several times a frame.
+
+        Args:
+            phase (int): The phase the time was spent in.
+        """
+        now = perf_counter()
+        self.current[phase] += now - self.mark
+        self.mark = now
+
+    def skip(self) -> None:
+        """
+        Leave the time since the last lap out of every phase. It still counts towards the frame.
+        """
+        self.mark = perf_counter()
+
+    def end(self) -> None:
+        """
+        Finish the frame and store it in the ring buffer, overwriting the oldest frame when full.
+        """
+        self.current[FRAME] = perf_counter() - self.frame_start
+        self.samples[self.index] = self.current
+        self.index = (self.index + 1) % self.capacity
+        self.count = min(self.count + 1, self.capacity)
+
+    def frames(self) -> np.ndarray:
+        """
+        Get the recorded frames from oldest to newest.
+
+        Returns:
+            np.ndarray: One row per frame and one column per phase, in seconds.
+        """
+        if self.count < self.capacity:
+            return self.samples[:self.count]
+        return np.roll(self.samples, -self.index, axis=0)
+
+    def percentiles(self) -> Dict[str, List[float]]:
+        """
+        Get the p50, p95 and p99 duration of every phase in milliseconds.
+
+        Returns:
+            Dict[str, List[float]]: The percentiles, keyed by phase name.
+        """
+        if self.count == 0:
+            return {name: [0.0] * len(PERCENTILES) for name in COLUMNS}
+
+        values = np.percentile(self.samples[:self.count], PERCENTILES, axis=0) * 1000
+        return {name: values[:, column].tolist() for column, name in enumerate(COLUMNS)}
+
+    def export(self, path: Path) -> None:
+        """
+        Write the recorded frames to a file, as CSV if the name ends in .csv and as JSON otherwise.
+
+        Args:
+            path (Path): The file to write.
+        """
+        path = Path(path)
+        frames = self.frames()
+
+        if path.suffix == '.csv':
+            lines = [','.join(COLUMNS)]
+            lines.extend(','.join(f'{value:.9f}' for value in row) for row in frames.tolist())
+            path.write_text('\n'.join(lines) + '\n')
+        else:
+            data = {
+                'columns': COLUMNS,
+                'unit': 's',
+                'percentiles': PERCENTILES,
+                'percentiles_ms': self.percentiles(),
+                'frames': frames.tolist()
+            }
+            path.write_text(json.dumps(data))
@@ -29,15 +29,25 @@ def create_map():
 
     def generate_paths(map_grid):
         def carve_passage(x, y):
-            directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
-            random.shuffle(directions)
-            for dx, dy in directions:
-                nx, ny = x + dx * 2, y + dy * 2 # Why times 2? don't know it just works T-T
-
-                if 1 <= nx < width - 1 and 1 <= ny < height - 1 and map_grid[ny][nx] == '#':
-                    map_grid[ny - dy][nx - dx] = ' '
-                    map_grid[ny][nx] = ' '
-                    carve_passage(nx, ny)
+            # explicit stack instead of recursion, so it doesn't run out of stack on big maps
+            stack = [(x, y)]
+            while stack:
+                x, y = stack[-1]
+                options = []
+                for dx, dy in [(1, 0), (-1, 0), (0, 1), (0, -1)]:
+                    nx, ny = x + dx * 2, y + dy * 2 # Why times 2? don't know it just works T-T
+                    if 1 <= nx < width - 1 and 1 <= ny < height - 1 and map_grid[ny][nx] == '#':
+                        options.append((dx, dy))
+
+                if not options:
+                    stack.pop()
+                    continue
+
+                dx, dy = random.choice(options)
+                nx, ny = x + dx * 2, y + dy * 2
+                map_grid[ny - dy][nx - dx] = ' '
+                map_grid[ny][nx] = ' '
+                stack.append((nx, ny))
 
         start_x, start_y = random.randint(1, (width - 1) // 2) * 2, random.randint(1, (height - 1) // 2) * 2
         map_grid[start_y][start_x] = ' '
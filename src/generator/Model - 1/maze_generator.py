@@ -21,21 +21,32 @@ class Maze:
         def getPivotPosition(self):
             return (random.randint(1, (self.dimensions[0] - 1) // 2) * 2, random.randint(1, (self.dimensions[1] - 1) // 2) * 2)
         
-        # Helper function to carve passage way in the maze
+        # Helper function to carve passage way in the maze, with an explicit stack so big mazes don't hit the recursion limit
         def carvePassageWay(x, y):
-            random.shuffle(directions)
-            for dx, dy in directions:
+            stack = [(x, y)]
+            while stack:
+                x, y = stack[-1]
+                options = []
+                for dx, dy in directions:
+                    nx, ny = x + dx * 2, y + dy * 2
+                    if 1 <= nx < self.dimensions[0] - 1 and 1 <= ny < self.dimensions[1] - 1 and self.level[ny][nx] == '#':
+                        options.append((dx, dy))
+
+                if not options:
+                    stack.pop()
+                    continue
+
+                dx, dy = random.choice(options)
                 nx, ny = x + dx * 2, y + dy * 2
-                if 1 <= nx < self.dimensions[0] - 1 and 1 <= ny < self.dimensions[1] - 1 and self.level[ny][nx] == '#':
-                    self.level[ny - dy][nx - dx] = ' '
-                    self.level[ny][nx] = ' '
-                    carvePassageWay(nx, ny)
+                self.level[ny - dy][nx - dx] = ' '
+                self.level[ny][nx] = ' '
+                stack.append((nx, ny))
 
         start = getPivotPosition(self)
-        level[start[1]][start[0]] = ' '
+        self.level[start[1]][start[0]] = ' '
         directions = [(1, 0), (-1, 0), (0, 1), (0, -1)]
         carvePassageWay(start[0], start[1])
-        return level
+        return self.level
     
     def getAssetPosition(self, asset):
         
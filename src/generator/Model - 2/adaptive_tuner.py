@@ -0,0 +1,176 @@
+import json
+import os
+import platform
+from pathlib import Path
+
+# Weight of the newest map in the running averages
+SMOOTHING = 0.3
+
+# Below this share of the target the generator moves back towards the requested map
+RELAX_BELOW = 0.5
+
+# Wall cells carved by the connectivity repair per 100 open tiles above which the map is too broken up
+REPAIR_LIMIT = 2.0
+
+# How far density moves per map, and the fraction seekers are cut by when a map is over the target
+DENSITY_STEP = 0.02
+SEEKER_CUT = 0.8
+
+
+class AdaptiveTuner:
+    def __init__(self, generator, target_latency=0.1, difficulty=(1.0, 2.5), density_range=None, profile=None):
+        """ Tune a generator's density, seekers and coins from its own stats so maps stay within a generation time, difficulty is seekers per 100 open tiles """
+        self.generator = generator
+        self.target_latency = target_latency
+        self.difficulty = difficulty
+
+        # The map asked for, the tuner never makes a map harder or more open than this range allows
+        self.requested = (generator.seekers, generator.collectibles, generator.density)
+        self.density_range = density_range or (generator.density, min(1.0, generator.density + 0.15))
+
+        # Running averages of generation time, seeker shortfall and connectivity repair work per map
+        self.latency = None
+        self.shortfall_rate = 0.0
+        self.repair_rate = 0.0
+        self.maps = 0
+
+        self.profile = None if profile is None else Path(profile)
+        self.load()
+
+    def key(self):
+        """ Profile entry for this machine, engine and map size """
+        generator = self.generator
+        return f'{platform.node()}:{type(generator).__name__}:{generator.width}x{generator.height}:{generator.tile_size}'
+
+    def load(self):
+        """ Start from the settings this machine ended on last time, if there is a profile """
+        if self.profile is None or not self.profile.exists():
+            return
+        try:
+            entry = json.loads(self.profile.read_text()).get(self.key())
+        except (OSError, ValueError):
+            return
+        if entry is None:
+            return
+
+        self.latency = entry['latency']
+        self.shortfall_rate = entry['shortfall_rate']
+        self.repair_rate = entry.get('repair_rate', 0.0)
+        self.maps = entry['maps']
+        self.apply(entry['seekers'], entry['collectibles'], entry['density'])
+
+    def save(self):
+        """ Store the current settings in the profile, other machines and map sizes keep their entries """
+        if self.profile is None or self.latency is None:
+            return
+        try:
+            profile = json.loads(self.profile.read_text()) if self.profile.exists() else {}
+        except ValueError:
+            profile = {}
+
+        generator = self.generator
+        profile[self.key()] = {
+            'seekers': generator.seekers,
+            'collectibles': generator.collectibles,
+            'density': generator.density,
+            'latency': self.latency,
+            'shortfall_rate': self.shortfall_rate,
+            'repair_rate': self.repair_rate,
+            'maps': self.maps
+        }
+
+        # Written next to the profile and moved into place, so a crash never leaves half a file
+        self.profile.parent.mkdir(parents=True, exist_ok=True)
+        temporary = self.profile.with_suffix(f'.{os.getpid()}.tmp')
+        temporary.write_text(json.dumps(profile, indent=2))
+        os.replace(temporary, self.profile)
+
+    def apply(self, seekers, collectibles, density):
+        """ Set the generator's parameters, kept inside the requested map and the density range """
+        requested_seekers, requested_collectibles, _ = self.requested
+        low, high = self.density_range
+        self.generator.seekers = max(0, min(requested_seekers, seekers))
+        self.generator.collectibles = max(min(1, requested_collectibles), min(requested_collectibles, collectibles))
+        self.generator.density = round(max(low, min(high, density)), 4)
+
+    def seekerBounds(self, open_tiles):
+        """ The fewest and most seekers that keep a map with this many open tiles inside the difficulty band """
+        low, high = self.difficulty
+        return int(-(-low * open_tiles // 100)), int(high * open_tiles // 100)
+
+    def average(self, mean, value):
+        """ Move a running average towards a new value """
+        return value if mean is None else mean + SMOOTHING * (value - mean)
+
+    def observe(self, stats):
+        """ Learn from the stats of a finished map, then set the parameters of the next one """
+        generator = self.generator
+        counts = stats['counts']
+        requested = counts.get('seekers_requested', generator.seekers)
+        shortfall = requested - counts.get('seekers_placed', requested) + counts.get('seekers_removed', 0)
+        open_tiles = max(1, stats['entities']['open'])
+
+        self.latency = self.average(self.latency, stats['total'])
+        self.shortfall_rate = self.average(self.shortfall_rate, shortfall / requested if requested else 0.0)
+        self.repair_rate = self.average(self.repair_rate, 100 * counts.get('cells_carved', 0) / open_tiles)
+        self.maps += 1
+
+        seekers, collectibles, density = generator.seekers, generator.collectibles, generator.density
+        over = self.latency > self.target_latency
+        relaxed = self.latency < self.target_latency * RELAX_BELOW
+        crowded = self.shortfall_rate > 0.1 or self.repair_rate > REPAIR_LIMIT
+
+        # Open maps have fewer areas to join and more room for seekers, so they are cheaper and fail less often
+        if over or crowded:
+            density += DENSITY_STEP
+        elif relaxed:
+            density -= DENSITY_STEP
+
+        # Seekers drive the solver's work, cut them fast when over the target and add them back one at a time
+        if over:
+            seekers = int(seekers * SEEKER_CUT)
+        elif relaxed and not crowded:
+            seekers += 1
+
+        # The difficulty band has the final say, measured on the open tiles of the map just made
+        fewest, most = self.seekerBounds(stats['entities']['open'])
+        seekers = max(fewest, min(most, seekers))
+
+        # Coins follow the seekers, so the reward stays in step with the risk
+        requested_seekers, requested_collectibles, _ = self.requested
+        if requested_seekers:
+            collectibles = round(requested_collectibles * min(seekers, requested_seekers) / requested_seekers)
+
+        self.apply(seekers, collectibles, density)
+
+    def generateMap(self, seed=None):
+        """ Generate a map with the current parameters and tune them from its stats """
+        self.generator.generateMap(seed)
+        self.observe(self.generator.stats)
+        return self.generator.map
+
+    def summary(self):
+        """ Current parameters and running averages """
+        generator = self.generator
+        return {
+            'seekers': generator.seekers,
+            'collectibles': generator.collectibles,
+            'density': generator.density,
+            'latency': self.latency,
+            'target_latency': self.target_latency,
+            'shortfall_rate': self.shortfall_rate,
+            'repair_rate': self.repair_rate,
+            'maps': self.maps
+        }
+
+
+if __name__ == '__main__':
+    import sys
+    from vector_generator import VectorMapGenerator
+
+    # adaptive_tuner.py [target ms] [maps]  tunes the default map with the solver on and prints where it settles
+    target = float(sys.argv[1]) / 1000 if len(sys.argv) > 1 else 0.03
+    tuner = AdaptiveTuner(VectorMapGenerator(tile_size=(28, 72), seed=0), target_latency=target)
+    for _ in range(int(sys.argv[2]) if len(sys.argv) > 2 else 100):
+        tuner.generateMap()
+    print(tuner.summary())
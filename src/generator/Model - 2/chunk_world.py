@@ -0,0 +1,190 @@
+from collections import OrderedDict
+
+import numpy as np
+
+from vector_generator import VectorMapGenerator
+from tile_grid import TileGrid, WALL, EMPTY, START
+
+# What a random stream is drawn for, so chunks and the edges between them never share one
+CHUNK_STREAM = 0
+VERTICAL_EDGE_STREAM = 1
+HORIZONTAL_EDGE_STREAM = 2
+
+# Chunks whose collected coins are remembered, the ones visited longest ago get their coins back first
+COLLECTED_CHUNKS = 4096
+
+
+def zigzag(n):
+    """ Map any integer onto a non-negative one, 0, -1, 1, -2, 2... become 0, 1, 2, 3, 4... """
+    return 2 * n if n >= 0 else -2 * n - 1
+
+
+class ChunkGenerator(VectorMapGenerator):
+    def __init__(self, width=16, height=16, seekers=2, collectibles=2, density=0.6, door_chance=0.25, seed=None):
+        """ Generate the chunks of an endless world, each one depends only on the world seed and its chunk coordinates """
+        super().__init__(width, height, seekers, collectibles, density, seed)
+        self.door_chance = door_chance
+        self.world_seed = None
+        self.startWorld()
+
+    def startWorld(self, seed=None):
+        """ Pick the seed of the next world """
+        self.world_seed = self.seeds.getrandbits(63) if seed is None else seed
+
+    def stream(self, kind, cx, cy):
+        """ Random number generator for one chunk or edge of the world """
+        return np.random.default_rng([self.world_seed, kind, zigzag(cx), zigzag(cy)])
+
+    def edgeDoors(self, kind, cx, cy):
+        """ Openings along the right (vertical) or bottom (horizontal) edge of chunk (cx, cy), both chunks sharing it draw the same ones """
+        rng = self.stream(kind, cx, cy)
+        length = self.height if kind == VERTICAL_EDGE_STREAM else self.width
+
+        # Never in a corner, and always at least one so the world stays connected
+        doors = (np.flatnonzero(rng.random(length - 2) < self.door_chance) + 1).tolist()
+        return doors or [int(rng.integers(1, length - 1))]
+
+    def doors(self, cx, cy):
+        """ Door cells on the border of chunk (cx, cy), each with the cell just inside it """
+        right, bottom = self.width - 1, self.height - 1
+        doors = []
+        doors += [((0, y), (1, y)) for y in self.edgeDoors(VERTICAL_EDGE_STREAM, cx - 1, cy)]
+        doors += [((right, y), (right - 1, y)) for y in self.edgeDoors(VERTICAL_EDGE_STREAM, cx, cy)]
+        doors += [((x, 0), (x, 1)) for x in self.edgeDoors(HORIZONTAL_EDGE_STREAM, cx, cy - 1)]
+        doors += [((x, bottom), (x, bottom - 1)) for x in self.edgeDoors(HORIZONTAL_EDGE_STREAM, cx, cy)]
+        return doors
+
+    def generateChunk(self, cx, cy):
+        """ Generate chunk (cx, cy) of the current world, walled in apart from the doors shared with its neighbours """
+        self.rng = self.stream(CHUNK_STREAM, cx, cy)
+        self.seed = (self.world_seed, cx, cy)
+        self.startStats()
+        self.map = TileGrid(self.width, self.height, WALL)
+        self.cells = cells = self.map.array()
+
+        inner = self.rng.random((self.height - 2, self.width - 2)) < self.density
+        cells[1:-1, 1:-1][inner] = EMPTY
+
+        # The cells inside the doors have to be open before anything is placed
+        doors = self.doors(cx, cy)
+        for _, (x, y) in doors:
+            cells[y, x] = EMPTY
+
+        # The world starts in the top left corner of chunk (0, 0)
+        points = [inside for _, inside in doors]
+        if (cx, cy) == (0, 0):
+            cells[self.spawn[1], self.spawn[0]] = START
+            points.append(self.spawn)
+
+        self.lapStats('carve')
+
+        self.placeSeekers()
+        self.lapStats('seekers')
+        self.placeCollectibles()
+        self.lapStats('collectibles')
+
+        # Every door, seeker and coin is joined inside the chunk, so neighbouring chunks join through the doors
+        self.repairConnectivity(points + self.getAssetPositions())
+        for (x, y), _ in doors:
+            cells[y, x] = EMPTY
+        self.lapStats('connectivity')
+
+        self.finishStats()
+        return self.map
+
+    @property
+    def spawn(self):
+        """ Where the player starts in the world """
+        return (1, 1)
+
+
+class ChunkWorld:
+    def __init__(self, generator, keep_radius=4):
+        """ An endless world of chunks, generated the first time they are needed and dropped once the player is far away """
+        self.generator = generator
+        self.width = generator.width
+        self.height = generator.height
+        self.keep_radius = keep_radius
+
+        # Loaded chunks, and the coins picked up in recently visited chunks so they stay gone when they are generated again
+        self.chunks = {}
+        self.collected = OrderedDict()
+
+        self.generated = 0
+        self.evicted = 0
+
+    @property
+    def spawn(self):
+        """ Where the player starts, in world tiles """
+        return self.generator.spawn
+
+    def reset(self, seed=None):
+        """ Forget every chunk and move on to the next world """
+        self.generator.startWorld(seed)
+        self.chunks.clear()
+        self.collected.clear()
+
+    def chunkOf(self, x, y):
+        """ Coordinates of the chunk holding world tile (x, y) """
+        return x // self.width, y // self.height
+
+    def chunk(self, cx, cy):
+        """ The grid of chunk (cx, cy), generated if it is not loaded """
+        grid = self.chunks.get((cx, cy))
+        if grid is None:
+            grid = self.generator.generateChunk(cx, cy)
+            if (cx, cy) in self.collected:
+                self.collected.move_to_end((cx, cy))
+                for x, y in self.collected[(cx, cy)]:
+                    grid[y][x] = EMPTY
+            self.chunks[(cx, cy)] = grid
+            self.generated += 1
+        return grid
+
+    def tile(self, x, y):
+        """ Tile code at world tile (x, y) """
+        cx, cy = self.chunkOf(x, y)
+        return self.chunk(cx, cy)[y - cy * self.height][x - cx * self.width]
+
+    def window(self, cx, cy, radius_x, radius_y):
+        """ Copy the chunks within the given radii of chunk (cx, cy) into one grid, return it with its top left world tile """
+        columns, rows = 2 * radius_x + 1, 2 * radius_y + 1
+        cells = np.empty((rows * self.height, columns * self.width), dtype=np.uint8)
+        for j in range(rows):
+            for i in range(columns):
+                chunk = self.chunk(cx - radius_x + i, cy - radius_y + j)
+                cells[j * self.height:(j + 1) * self.height, i * self.width:(i + 1) * self.width] = chunk.array()
+
+        origin = ((cx - radius_x) * self.width, (cy - radius_y) * self.height)
+        return TileGrid(columns * self.width, rows * self.height, data=cells.tobytes()), origin
+
+    def collect(self, x, y):
+        """ Remove the coin at world tile (x, y) for good """
+        cx, cy = self.chunkOf(x, y)
+        local = (x - cx * self.width, y - cy * self.height)
+        self.collected.setdefault((cx, cy), set()).add(local)
+        self.collected.move_to_end((cx, cy))
+        if len(self.collected) > COLLECTED_CHUNKS:
+            self.collected.popitem(last=False)
+        grid = self.chunks.get((cx, cy))
+        if grid is not None:
+            grid[local[1]][local[0]] = EMPTY
+
+    def evict(self, cx, cy):
+        """ Drop the chunks further than keep_radius from chunk (cx, cy), return their coordinates """
+        far = [key for key in self.chunks if max(abs(key[0] - cx), abs(key[1] - cy)) > self.keep_radius]
+        for key in far:
+            del self.chunks[key]
+        self.evicted += len(far)
+        return far
+
+    def stats(self):
+        """ Chunks loaded now, and generated and evicted so far """
+        return {'loaded': len(self.chunks), 'generated': self.generated, 'evicted': self.evicted}
+
+
+if __name__ == '__main__':
+    world = ChunkWorld(ChunkGenerator())
+    grid, origin = world.window(0, 0, 2, 1)
+    for row in grid.toRows():
+        print(row)
@@ -1,141 +1,439 @@
+import json
 import random
 import time
+from collections import deque
+
+from tile_grid import TileGrid, WALL, EMPTY, START, END, SEEKER, COIN
+
+# The phases a map is built in, in order, for reporting progress
+PHASES = ('carve', 'seekers', 'collectibles', 'connectivity', 'solver')
+
+
+def runSteps(steps):
+    """ Run a step generator to the end and return its result """
+    while True:
+        try:
+            next(steps)
+        except StopIteration as stop:
+            return stop.value
+
 
 class MapGenerator:
-    def __init__(self, width=68, height=15, seekers=10, collectibles=10):
+    def __init__(self, width=68, height=15, seekers=10, collectibles=10, density=0.6, seed=None, *, tile_size=None):
         self.width = width
         self.height = height
         self.seekers = seekers
         self.collectibles = collectibles
-        self.map = []
+        self.density = density
+        self.map = None
+        self.placement_error = None
+
+        # Tile size in pixels the map is played at, maps are only proven winnable past the seekers when it is known
+        self.tile_size = tile_size
+        self.seekers_removed = 0
+        self.solve_ticks = None
+
+        # Every map gets its own seed drawn from this stream, so any map can be rebuilt
+        self.seeds = random.Random(seed)
+        self.seed = None
+        self.rng = None
+
+        # Phase timings, counts and rejection reasons of the last map, optionally written as JSON lines to telemetry
+        self.stats = None
+        self.stats_started = self.stats_mark = 0.0
+        self.telemetry = None
+
+    def params(self):
+        """ Get the parameters that together with a seed fully determine a map """
+        return (self.width, self.height, self.seekers, self.collectibles, self.density, self.tile_size)
+
+    @classmethod
+    def fromParams(cls, params, seed=None):
+        """ Create a generator from the parameters returned by params() """
+        width, height, seekers, collectibles, density, tile_size = params
+        return cls(width, height, seekers, collectibles, density, seed, tile_size=tile_size)
+
+    def startMap(self, seed):
+        """ Pick the seed of the next map and reset the random number generator to it """
+        self.seed = self.seeds.getrandbits(63) if seed is None else seed
+        self.rng = random.Random(self.seed)
+        self.startStats()
+
+    def startStats(self):
+        """ Start the stats of the next map, filled in phase by phase """
+        self.stats = {
+            'engine': type(self).__name__,
+            'seed': self.seed,
+            'params': list(self.params()),
+            'phases': {},
+            'counts': {},
+            'rejections': {},
+            'entities': {}
+        }
+        self.stats_started = self.stats_mark = time.perf_counter()
+
+    def skipStats(self, seconds):
+        """ Leave time spent away from the map, between steps, out of its phase timings """
+        self.stats_started += seconds
+        self.stats_mark += seconds
+
+    def lapStats(self, phase):
+        """ Add the time since the last lap to a phase """
+        now = time.perf_counter()
+        self.stats['phases'][phase] = self.stats['phases'].get(phase, 0.0) + now - self.stats_mark
+        self.stats_mark = now
+
+    def addStat(self, name, n=1, group='counts'):
+        """ Add to a count, or to a rejection reason with group='rejections' """
+        if self.stats is not None:
+            self.stats[group][name] = self.stats[group].get(name, 0) + n
+
+    def finishStats(self):
+        """ Count what ended up on the map and send the stats to the telemetry sink """
+        self.stats['entities'] = {
+            'seekers': self.map.count(SEEKER),
+            'collectibles': self.map.count(COIN),
+            'open': self.width * self.height - self.map.count(WALL)
+        }
+        self.stats['placement_error'] = self.placement_error
+        self.stats['total'] = time.perf_counter() - self.stats_started
+        if self.telemetry is not None:
+            self.telemetry.write(json.dumps(self.stats) + '\n')
+            self.telemetry.flush()
+
+    def openTelemetry(self, path):
+        """ Append the stats of every map generated from now on to a JSON-lines file """
+        self.closeTelemetry()
+        self.telemetry = open(path, 'a')
+
+    def closeTelemetry(self):
+        """ Stop writing stats to the JSON-lines file """
+        if self.telemetry is not None:
+            self.telemetry.close()
+            self.telemetry = None
 
-    def generateMap(self):
+    def generateMap(self, seed=None):
         """ Generate a random map with walls, empty spaces, seekers, and collectibles """
-        while True:
-            self.map = [['#' for _ in range(self.width)] for _ in range(self.height)]
-
-            # Randomly place empty spaces
-            for y in range(1, self.height - 1):
-                for x in range(1, self.width - 1):
-                    if random.random() < 0.6:  # Adjust this value for density
-                        self.map[y][x] = ' '
-
-            # Place start and end positions
-            start = (1, 1)
-            end = (self.width - 2, self.height - 2)
-            self.map[start[1]][start[0]] = 'S'
-            self.map[end[1]][end[0]] = 'E'
-
-            # Place seekers with a time limit
-            self.start_time = time.time()
-            placed_seekers = 0
-            while placed_seekers < self.seekers and (time.time() - self.start_time) < 5:
-                if self.placeSeekers():
-                    placed_seekers += 1
-
-            # Place collectibles
-            for _ in range(self.collectibles):
-                self.placeCollectibles()
-
-            # Ensure the map is clearable
-            if self.isMapClearable(start, end, self.getAssetPositions()):
-                break
+        runSteps(self.generateSteps(seed))
+
+    def generateSteps(self, seed=None):
+        """ Generate the map a bounded piece of work at a time, yielding the phase and how far into it the work is """
+        self.startMap(seed)
+        self.map = TileGrid(self.width, self.height, WALL)
+
+        # Randomly place empty spaces
+        for y in range(1, self.height - 1):
+            for x in range(1, self.width - 1):
+                if self.rng.random() < self.density:
+                    self.map[y][x] = EMPTY
+            yield 'carve', y / self.height
+
+        # Place start and end positions
+        start = (1, 1)
+        end = (self.width - 2, self.height - 2)
+        self.map[start[1]][start[0]] = START
+        self.map[end[1]][end[0]] = END
+        self.lapStats('carve')
+
+        # Place seekers
+        yield from self.seekerSteps()
+        self.lapStats('seekers')
+
+        # Place collectibles
+        for i in range(self.collectibles):
+            self.placeCollectibles()
+            yield 'collectibles', (i + 1) / self.collectibles
+        self.lapStats('collectibles')
+
+        # Ensure the map is clearable by joining everything the player must reach
+        yield from self.repairSteps([start, end] + self.getAssetPositions())
+        self.lapStats('connectivity')
+
+        # Ensure the end can be reached without being heard
+        if self.tile_size is not None:
+            yield from self.solvableSteps()
+            self.lapStats('solver')
+
+        self.finishStats()
 
     def placeSeekers(self):
-        """ Place a seeker in the map, avoiding positions between close walls """
-        while True:
-            if (time.time() - self.start_time) > 5:
-                break
-                return False
-            x = random.randint(1, self.width - 2)
-            y = random.randint(1, self.height - 2)
-            if self.map[y][x] == ' ' and self.isBetweenClosedWalls(x, y) and self.seekersInVicinity(x, y):
-                self.map[y][x] = '$'
-                return True
+        """ Place all seekers, recording in placement_error why any could not be placed """
+        return runSteps(self.seekerSteps())
+
+    def seekerSteps(self):
+        """ The work of placeSeekers, yielding while the candidates are found """
+        xs, ys, runs = yield from self.candidateSteps()
+        positions = self.chooseSeekerPositions(xs, ys, runs)
+        for x, y in positions:
+            self.map[y][x] = SEEKER
+        return len(positions)
+
+    def seekerCandidates(self):
+        """ Get every empty cell with more than 4 cells to a wall on one side, with the id of its horizontal run """
+        return runSteps(self.candidateSteps())
+
+    def candidateSteps(self):
+        """ The work of seekerCandidates, yielding every 16 rows """
+        xs, ys, runs = [], [], []
+        for y in range(1, self.height - 1):
+            row = self.map[y]
+
+            # Nearest wall to the left and to the right of every cell in the row
+            left_wall = [0] * self.width
+            wall = 0
+            for x in range(self.width):
+                if row[x] == WALL:
+                    wall = x
+                left_wall[x] = wall
+            right_wall = [0] * self.width
+            wall = self.width - 1
+            for x in range(self.width - 1, -1, -1):
+                if row[x] == WALL:
+                    wall = x
+                right_wall[x] = wall
+
+            for x in range(1, self.width - 1):
+                if row[x] == EMPTY and (x - left_wall[x] > 4 or right_wall[x] - x > 4):
+                    xs.append(x)
+                    ys.append(y)
+                    runs.append(y * self.width + left_wall[x])
 
-        return False 
+            if y % 16 == 0:
+                yield 'seekers', y / self.height
 
+        return xs, ys, runs
+
+    def chooseSeekerPositions(self, xs, ys, runs):
+        """ Sample seeker positions from a live set of eligible cells that shrinks after every pick """
+        live = list(zip(xs, ys))
+        slot = {position: i for i, position in enumerate(live)}
+        run_cells = {}
+        for position, run in zip(live, runs):
+            run_cells.setdefault(run, []).append(position)
+        run_of = dict(zip(live, runs))
+
+        def remove(position, reason):
+            i = slot.pop(position, None)
+            if i is None:
+                return
+            last = live.pop()
+            if i < len(live):
+                live[i] = last
+                slot[last] = i
+            self.addStat(reason, group='rejections')
+
+        # Open cells that are too close to a wall on both sides never become candidates
+        self.addStat('seeker_candidates', len(xs))
+        self.addStat('seeker_runs', len(run_cells))
+        self.addStat('walls', self.map.count(EMPTY) - len(xs), group='rejections')
+
+        positions = []
+        while len(positions) < self.seekers and live:
+            x, y = live[self.randomIndex(len(live))]
+            positions.append((x, y))
+
+            # Only one seeker per run and none within a 2-block radius of another
+            for position in run_cells[run_of[(x, y)]]:
+                remove(position, 'run')
+            for j in range(y - 2, y + 3):
+                for i in range(x - 2, x + 3):
+                    remove((i, j), 'vicinity')
+
+        self.addStat('seekers_requested', self.seekers)
+        self.addStat('seekers_placed', len(positions))
+        if len(positions) == self.seekers:
+            self.placement_error = None
+        elif not xs:
+            self.placement_error = (
+                f"Placed 0 of {self.seekers} seekers: no empty cell has more than 4 cells to a wall on one side"
+            )
+        else:
+            self.placement_error = (
+                f"Placed {len(positions)} of {self.seekers} seekers: the map has {len(xs)} empty cells in "
+                f"{len(run_cells)} horizontal runs with more than 4 cells to a wall on one side, and each of "
+                f"them shares a run with a seeker or is within 2 blocks of one"
+            )
+
+        return positions
+
+    def randomIndex(self, n):
+        """ Pick a random index below n """
+        return self.rng.randrange(n)
 
     def placeCollectibles(self):
         """ Place a collectible in the map, ensuring it is reachable """
         while True:
-            x = random.randint(1, self.width - 2)
-            y = random.randint(1, self.height - 2)
-            if self.map[y][x] == ' ':
-                self.map[y][x] = 'C'
+            x = self.rng.randint(1, self.width - 2)
+            y = self.rng.randint(1, self.height - 2)
+            self.addStat('collectible_probes')
+            if self.map[y][x] == EMPTY:
+                self.map[y][x] = COIN
                 return
 
-    def isBetweenClosedWalls(self, x, y):
-        """ Check if a position is between two close walls horizontally with less than 3 spaces """
-        k = 1
-        while self.map[y][x - k] != '#':
-            if self.map[y][x - k] == '$':
-                return False
-            k += 1
-        l = 1
-        while self.map[y][x + l] != '#':
-            if self.map[y][x + l] == '$':
-                return False
-            l += 1
-
-        return True if k > 4 or l > 4 else False
-
-    def seekersInVicinity(self, x, y):
-        """ Function to check if a seeker is within a 2-block radius of another seeker """
-
-        # Define the range to check (two-block radius in all directions)
-        start_row = max(0, x - 2)
-        end_row = min(self.width - 1, x + 2)
-        start_col = max(0, y - 2)
-        end_col = min(self.height - 1, y + 2)
-
-        # Check the surrounding cells within the two-block radius
-        for i in range(start_row, end_row + 1):
-            for j in range(start_col, end_col + 1):
-                if (i == x and j == y):
-                    continue
-                if self.map[j][i] == '$':
-                    return False
-        return True
-
     def getAssetPositions(self):
         """ Get positions of all seekers and collectibles """
-        assets = []
-        for y in range(self.height):
-            for x in range(self.width):
-                if self.map[y][x] in ('$','C'):
-                    assets.append((x,y))
-        return assets
+        return self.map.find(SEEKER) + self.map.find(COIN)
+
+    def componentLabels(self):
+        """ Label the connected open areas of the map row-major by cell index, walls get label 0, and count their cells """
+        width = self.width
+        cells = self.map.data
+        labels = [0] * len(cells)
+        sizes = [0]
+
+        # The border is always wall, so the neighbours of an open cell are always on the map
+        for i in range(len(cells)):
+            if cells[i] == WALL or labels[i]:
+                continue
+
+            label = len(sizes)
+            labels[i] = label
+            queue = deque([i])
+            size = 0
+            while queue:
+                cell = queue.popleft()
+                size += 1
+                for neighbour in (cell - 1, cell + 1, cell - width, cell + width):
+                    if cells[neighbour] != WALL and not labels[neighbour]:
+                        labels[neighbour] = label
+                        queue.append(neighbour)
+            sizes.append(size)
+
+        return labels, sizes
+
+    def carve(self, x, y):
+        """ Turn a wall cell into an empty space """
+        self.map[y][x] = EMPTY
+
+    def repairConnectivity(self, points):
+        """ Carve the fewest wall cells needed to join the areas holding the given points, return how many were carved """
+        return runSteps(self.repairSteps(points))
+
+    def repairSteps(self, points):
+        """ The work of repairConnectivity, yielding after labelling the areas and after every area joined """
+        width, height = self.width, self.height
+        labels, sizes = self.componentLabels()
+        yield 'connectivity', 0.0
+        required = {labels[y * width + x] for x, y in points}
+
+        # Everything gets joined onto the largest area that has to be reachable
+        main = max(required, key=lambda label: sizes[label])
+        joined = {main}
+        carved = 0
+
+        for n, (x, y) in enumerate(points):
+            if labels[y * width + x] in joined:
+                continue
+
+            # 0-1 BFS: open cells cost nothing to cross, walls cost one carve
+            origin = y * width + x
+            cost = [len(labels)] * len(labels)
+            parent = {origin: None}
+            cost[origin] = 0
+            queue = deque([origin])
+            while queue:
+                cell = queue.popleft()
+                if labels[cell] in joined:
+                    break
+                for neighbour in (cell - 1, cell + 1, cell - width, cell + width):
+                    step = 0 if labels[neighbour] else 1
+
+                    # Border walls are never carved
+                    if step and not (width <= neighbour < (height - 1) * width and 0 < neighbour % width < width - 1):
+                        continue
+                    if cost[cell] + step < cost[neighbour]:
+                        cost[neighbour] = cost[cell] + step
+                        parent[neighbour] = cell
+                        if step:
+                            queue.append(neighbour)
+                        else:
+                            queue.appendleft(neighbour)
+
+            # Walk back along the path, carving walls and joining every area it crosses
+            while cell is not None:
+                if labels[cell]:
+                    joined.add(labels[cell])
+                else:
+                    self.carve(cell % width, cell // width)
+                    labels[cell] = main
+                    carved += 1
+                cell = parent[cell]
+            yield 'connectivity', (n + 1) / len(points)
+
+        self.addStat('areas', len(sizes) - 1)
+        self.addStat('areas_joined', len(joined) - 1)
+        self.addStat('cells_carved', carved)
+        return carved
+
+    def makeSolvable(self):
+        """ Remove the seeker that hears the player most until the end can be reached unheard, return how many were removed """
+        return runSteps(self.solvableSteps())
+
+    def solvableSteps(self):
+        """ The work of makeSolvable, yielding after every tick of every search """
+        from seeker_solver import SeekerSolver
+
+        removed = 0
+        while True:
+            solver = SeekerSolver(self.map, self.tile_size)
+            for tick in solver.solveSteps():
+                yield 'solver', min(tick / solver.horizon, 1.0)
+            if solver.ticks is not None or not solver.seekers:
+                break
+
+            # A search that ran out of ticks without any seeker hearing the player has no one to blame
+            if not solver.proven and not solver.blame.max():
+                break
+            x, y = solver.mostBlamed()
+            self.map[y][x] = EMPTY
+            removed += 1
+
+        self.seekers_removed = removed
+        self.solve_ticks = solver.ticks
+        self.addStat('solver_runs', removed + 1)
+        self.addStat('seekers_removed', removed)
+        if solver.ticks is not None:
+            self.addStat('solve_ticks', solver.ticks)
+        return removed
 
     def isMapClearable(self, start, end, assets):
-        """ Check if the map is clearable from start to end, collecting all assets """
+        """ Check if the map is clearable from start to end, collecting all assets, its time is added to the stats of the map """
+        started = time.perf_counter()
+        clearable = self.reachesAll(start, end, assets)
+        if self.stats is not None:
+            self.stats['phases']['clearable'] = self.stats['phases'].get('clearable', 0.0) + time.perf_counter() - started
+        return clearable
+
+    def reachesAll(self, start, end, assets):
+        """ Check that the end and every asset can be walked to from the start """
         def bfs(start, goals):
-            queue = [start]
-            visited = set()
+            queue = deque([start])
+            visited = {start}
             found = set()
 
             while queue:
-                x, y = queue.pop(0)
+                x, y = queue.popleft()
                 if (x, y) in goals:
                     found.add((x, y))
                 if len(found) == len(goals):
                     return True
-                if (x, y) not in visited:
-                    visited.add((x, y))
-                    for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
-                        nx, ny = x + dx, y + dy
-                        if 0 <= nx < self.width and 0 <= ny < self.height and self.map[ny][nx] in (' ', 'S', 'E', '$', 'C') and (nx, ny) not in visited:
-                            queue.append((nx, ny))
+                for dx, dy in [(-1, 0), (1, 0), (0, -1), (0, 1)]:
+                    nx, ny = x + dx, y + dy
+                    if 0 <= nx < self.width and 0 <= ny < self.height and self.map[ny][nx] != WALL and (nx, ny) not in visited:
+                        visited.add((nx, ny))
+                        queue.append((nx, ny))
             return False
 
         return bfs(start, {end} | set(assets))
 
     def printMap(self):
         """ Print the map """
-        for row in self.map:
-            print("".join(row))
+        for row in self.map.toRows():
+            print(row)
 
 if __name__ == '__main__':
     random_map = MapGenerator()
     random_map.generateMap()
     random_map.printMap()
+    if random_map.placement_error:
+        print(random_map.placement_error)
@@ -0,0 +1,88 @@
+import time
+
+from generator import PHASES
+
+
+class MapBuilder:
+    def __init__(self, generator, seed=None, steps=None, on_done=None):
+        """ Build one map with a generator's generateSteps, or other steps filling generator.map, a few milliseconds at a time so a game loop can keep drawing and reading input """
+        self.generator = generator
+        self.steps = generator.generateSteps(seed) if steps is None else steps
+        self.on_done = on_done
+        self.result = None
+
+        self.phase = PHASES[0]
+        self.progress = 0.0
+        self.done = False
+        self.cancelled = False
+
+        # When the last step ended, the time until the next one is left out of the map's stats
+        self.paused_at = None
+        self.steps_taken = 0
+
+    @property
+    def map(self):
+        """ The finished map, None until it is done """
+        return self.generator.map if self.done else None
+
+    def step(self, budget=0.004):
+        """ Work on the map for about budget seconds, return True once it is finished """
+        if self.done or self.cancelled:
+            return self.done
+
+        now = time.perf_counter()
+        if self.paused_at is not None and self.generator.stats is not None:
+            self.generator.skipStats(now - self.paused_at)
+        deadline = now + budget
+
+        while True:
+            try:
+                self.phase, fraction = next(self.steps)
+            except StopIteration as stop:
+                self.result = stop.value
+                self.done = True
+                self.progress = 1.0
+                if self.on_done is not None:
+                    self.on_done(self)
+                return True
+
+            # Phases the generator skips, like the solver without a tile size, are counted as done
+            self.progress = max(self.progress, (PHASES.index(self.phase) + fraction) / len(PHASES))
+            self.steps_taken += 1
+            if time.perf_counter() >= deadline:
+                break
+
+        self.paused_at = time.perf_counter()
+        return False
+
+    def finish(self):
+        """ Do the rest of the work in one go and return the map """
+        while not self.step(budget=float('inf')):
+            pass
+        return self.map
+
+    def cancel(self):
+        """ Stop building the map, the generator can be used for another one straight away """
+        if not self.done:
+            self.steps.close()
+            self.cancelled = True
+
+
+if __name__ == '__main__':
+    import sys
+    from maze_generator import MazeGenerator
+
+    # map_builder.py [size] [budget ms]  builds a large maze in time slices and prints how the work was spread
+    size = int(sys.argv[1]) if len(sys.argv) > 1 else 501
+    budget = float(sys.argv[2]) / 1000 if len(sys.argv) > 2 else 0.004
+    builder = MapBuilder(MazeGenerator(size, size, seed=0))
+    slices = []
+    while True:
+        started = time.perf_counter()
+        done = builder.step(budget)
+        slices.append(time.perf_counter() - started)
+        if done:
+            break
+    slices.sort()
+    print(f"{len(slices)} slices, {builder.steps_taken} steps, median {slices[len(slices) // 2] * 1e3:.2f} ms, max {slices[-1] * 1e3:.2f} ms")
+    print(builder.generator.stats['phases'])
@@ -0,0 +1,103 @@
+import hashlib
+import os
+import struct
+from pathlib import Path
+
+from generator import runSteps
+from tile_grid import TileGrid
+
+# File layout: header, then one byte per cell, entities are found on the map itself when it is played
+MAGIC = b'SNKM'
+FORMAT_VERSION = 3
+HEADER = struct.Struct('<4sBHH')
+
+
+class MapCache:
+    def __init__(self, directory, max_bytes=64 * 1024 * 1024):
+        self.directory = Path(directory)
+        self.max_bytes = max_bytes
+        self.directory.mkdir(parents=True, exist_ok=True)
+
+    def key(self, generator, params, seed):
+        """ Content address of the map a generator class builds from the given parameters and seed """
+        source = repr((FORMAT_VERSION, type(generator).__name__, tuple(params), seed))
+        return hashlib.sha256(source.encode()).hexdigest()
+
+    def path(self, key):
+        """ Path of the file holding a cached map """
+        return self.directory / f'{key}.map'
+
+    def load(self, key):
+        """ Load a cached map with a single read, return it or None on a miss """
+        path = self.path(key)
+        try:
+            data = path.read_bytes()
+        except FileNotFoundError:
+            return None
+
+        try:
+            magic, version, width, height = HEADER.unpack_from(data)
+            if magic != MAGIC or version != FORMAT_VERSION:
+                return None
+            if len(data) != HEADER.size + width * height:
+                raise struct.error(f"{len(data)} bytes do not hold a {width}x{height} map")
+        except struct.error:
+            # A truncated or corrupt file is dropped and counts as a miss
+            path.unlink(missing_ok=True)
+            return None
+
+        # Mark the file as recently used for eviction
+        os.utime(path)
+        return TileGrid.fromBytes(width, height, data[HEADER.size:])
+
+    def store(self, key, grid):
+        """ Write a map to the cache and evict the least recently used maps over the size limit """
+        data = HEADER.pack(MAGIC, FORMAT_VERSION, grid.width, grid.height) + grid.tobytes()
+
+        # Write next to the target and rename, so readers never see half a file
+        path = self.path(key)
+        temporary = path.with_suffix(f'.{os.getpid()}.tmp')
+        temporary.write_bytes(data)
+        os.replace(temporary, path)
+
+        self.evict()
+
+    def evict(self):
+        """ Delete the least recently used maps until the cache fits in max_bytes """
+        files = []
+        for entry in os.scandir(self.directory):
+            if entry.name.endswith('.map'):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_bytes:
+                break
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+            total -= size
+
+    def generate(self, generator, seed):
+        """ Fill generator.map for the given seed, from the cache when possible, return True on a hit """
+        return runSteps(self.generateSteps(generator, seed))
+
+    def generateSteps(self, generator, seed):
+        """ The work of generate, yielding the generator's steps on a miss """
+        key = self.key(generator, generator.params(), seed)
+        cached = self.load(key)
+        if cached is not None:
+            # Nothing was generated, so nothing of the generator's last map is left to be read as this one's
+            generator.map = cached
+            generator.seed = seed
+            generator.stats = None
+            generator.placement_error = None
+            generator.seekers_removed = 0
+            generator.solve_ticks = None
+            return True
+
+        yield from generator.generateSteps(seed)
+        self.store(key, generator.map)
+        return False
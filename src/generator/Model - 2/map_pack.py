@@ -0,0 +1,157 @@
+import mmap
+import os
+import struct
+from pathlib import Path
+
+from tile_grid import TileGrid, SEEKER
+
+# File layout: header, the map records one after another, then one offset per map pointing at its record.
+# A record is its stats followed by height rows of width bytes, one byte per cell.
+MAGIC = b'SNKP'
+FORMAT_VERSION = 1
+HEADER = struct.Struct('<4sBxxxIQ')     # magic, version, map count, offset of the index
+OFFSET = struct.Struct('<Q')
+RECORD = struct.Struct('<QHHHHH?xf')    # seed, width, height, attempts, seekers, seeker shortfall, clearable, generation time
+
+
+def packRecord(grid, seed, attempts, seekers, shortfall, clearable, generation_time):
+    """ Encode one map and its generation stats as a pack record """
+    return RECORD.pack(seed, grid.width, grid.height, attempts, seekers, shortfall, clearable, generation_time) + grid.tobytes()
+
+
+class PackWriter:
+    def __init__(self, path):
+        """ Write map records to a new pack file, the index and header are filled in on close """
+        self.path = Path(path)
+        self.temporary = self.path.with_suffix(f'.{os.getpid()}.tmp')
+        self.file = open(self.temporary, 'wb')
+        self.file.write(HEADER.pack(MAGIC, FORMAT_VERSION, 0, 0))
+        self.offsets = []
+
+    def add(self, record):
+        """ Append a record made by packRecord, return its index in the pack """
+        self.offsets.append(self.file.tell())
+        self.file.write(record)
+        return len(self.offsets) - 1
+
+    def close(self):
+        """ Write the index and the header, then move the pack into place so readers never see half a file """
+        index_offset = self.file.tell()
+        self.file.write(b''.join(OFFSET.pack(offset) for offset in self.offsets))
+        self.file.seek(0)
+        self.file.write(HEADER.pack(MAGIC, FORMAT_VERSION, len(self.offsets), index_offset))
+        self.file.close()
+        os.replace(self.temporary, self.path)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.file.close()
+            os.remove(self.temporary)
+
+
+class LevelPack:
+    def __init__(self, path):
+        """ Open a pack through mmap, only the header is read up front and levels are read when asked for """
+        self.path = Path(path)
+        self.file = open(self.path, 'rb')
+
+        # A short or cut off file is rejected here, rather than failing on a level halfway through a game
+        if os.fstat(self.file.fileno()).st_size < HEADER.size:
+            self.file.close()
+            raise ValueError(f"{self.path} is not a level pack")
+        self.data = mmap.mmap(self.file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.data)
+
+        magic, version, self.count, self.index_offset = HEADER.unpack_from(self.data)
+        if magic != MAGIC or version != FORMAT_VERSION:
+            self.close()
+            raise ValueError(f"{self.path} is not a level pack")
+        if self.index_offset + self.count * OFFSET.size > len(self.data):
+            self.close()
+            raise ValueError(f"{self.path} is truncated")
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, index):
+        return self.grid(index)
+
+    def __iter__(self):
+        """ Stream through the pack one level at a time, only the level being looked at is copied out """
+        for index in range(self.count):
+            yield self.grid(index)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, traceback):
+        self.close()
+
+    def offset(self, index):
+        """ Position of a level's record in the file """
+        if index < 0:
+            index += self.count
+        if not 0 <= index < self.count:
+            raise IndexError(f"Level {index} is out of range for a pack of {self.count}")
+        return OFFSET.unpack_from(self.data, self.index_offset + index * OFFSET.size)[0]
+
+    def stats(self, index):
+        """ Seed and generation stats of a level """
+        seed, width, height, attempts, seekers, shortfall, clearable, generation_time = RECORD.unpack_from(self.data, self.offset(index))
+        return {
+            'seed': seed,
+            'width': width,
+            'height': height,
+            'attempts': attempts,
+            'seekers': seekers,
+            'shortfall': shortfall,
+            'clearable': clearable,
+            'generation_time': generation_time
+        }
+
+    def cells(self, index):
+        """ Zero-copy view of a level's cells, row-major with one byte per cell, and its width and height """
+        offset = self.offset(index)
+        _, width, height, *_ = RECORD.unpack_from(self.data, offset)
+        start = offset + RECORD.size
+        return self.view[start:start + width * height], width, height
+
+    def rows(self, index):
+        """ Zero-copy views of a level's rows """
+        cells, width, height = self.cells(index)
+        return [cells[y * width:(y + 1) * width] for y in range(height)]
+
+    def grid(self, index):
+        """ Copy a level out into a TileGrid that can be played and changed """
+        cells, width, height = self.cells(index)
+        return TileGrid.fromBytes(width, height, cells)
+
+    def close(self):
+        """ Unmap the pack, any views still held must be released first """
+        self.view.release()
+        self.data.close()
+        self.file.close()
+
+
+if __name__ == '__main__':
+    import sys
+
+    # map_pack.py build <pack> <text maps...>  packs maps stored as text, one row per line
+    # map_pack.py show <pack> [index]          prints a level and its stats
+    if sys.argv[1] == 'build':
+        with PackWriter(sys.argv[2]) as writer:
+            for name in sys.argv[3:]:
+                with open(name) as file:
+                    grid = TileGrid.fromRows(line.strip() for line in file if line.strip())
+                writer.add(packRecord(grid, 0, 0, grid.count(SEEKER), 0, True, 0.0))
+    else:
+        with LevelPack(sys.argv[2]) as pack:
+            index = int(sys.argv[3]) if len(sys.argv) > 3 else 0
+            for row in pack.grid(index).toRows():
+                print(row)
+            print(pack.stats(index))
@@ -0,0 +1,218 @@
+from generator import MapGenerator, runSteps
+from tile_grid import TileGrid, WALL, EMPTY, START, END
+
+BACKTRACKER = 'backtracker'
+ELLER = 'eller'
+
+# Maze cells carved, or rows streamed, between two steps of a maze being generated a piece at a time
+CELLS_PER_STEP = 1024
+ROWS_PER_STEP = 16
+
+
+def carveBacktracker(grid, rng):
+    """ Carve a perfect maze into an all-wall grid with a depth-first backtracker, using an explicit stack instead of recursion """
+    return runSteps(backtrackerSteps(grid, rng))
+
+
+def backtrackerSteps(grid, rng):
+    """ The work of carveBacktracker, yielding the share of maze cells visited every CELLS_PER_STEP cells """
+    width = grid.width
+    cells = grid.data
+    columns, rows = (grid.width - 1) // 2, (grid.height - 1) // 2
+
+    # Maze cells sit on odd tiles, the tiles between two of them are the walls that get knocked through
+    visited = bytearray(columns * rows)
+    cell = rng.randrange(columns * rows)
+    visited[cell] = 1
+    cells[(2 * (cell // columns) + 1) * width + 2 * (cell % columns) + 1] = EMPTY
+    stack = [cell]
+    carved = 1
+
+    while stack:
+        cell = stack[-1]
+        x, y = cell % columns, cell // columns
+
+        neighbours = []
+        if x > 0 and not visited[cell - 1]:
+            neighbours.append(cell - 1)
+        if x < columns - 1 and not visited[cell + 1]:
+            neighbours.append(cell + 1)
+        if y > 0 and not visited[cell - columns]:
+            neighbours.append(cell - columns)
+        if y < rows - 1 and not visited[cell + columns]:
+            neighbours.append(cell + columns)
+
+        if not neighbours:
+            stack.pop()
+            continue
+
+        # Knock through to a random unvisited neighbour and carry on from there
+        neighbour = neighbours[rng.randrange(len(neighbours))]
+        visited[neighbour] = 1
+        nx, ny = neighbour % columns, neighbour // columns
+        cells[(2 * ny + 1) * width + 2 * nx + 1] = EMPTY
+        cells[(y + ny + 1) * width + x + nx + 1] = EMPTY
+        stack.append(neighbour)
+
+        carved += 1
+        if carved % CELLS_PER_STEP == 0:
+            yield carved / len(visited)
+
+    return grid
+
+
+def ellerRows(width, height, rng, join_chance=0.5, down_chance=0.3):
+    """ Yield the tile rows of a perfect maze top to bottom with Eller's algorithm, keeping only one row of sets, endless if height is None """
+    columns = (width - 1) // 2
+    rows = None if height is None else (height - 1) // 2
+    wall_row = bytes([WALL]) * width
+    yield wall_row
+
+    # The set every cell of the current row belongs to, ids are always below columns
+    sets = list(range(columns))
+    y = 0
+    while rows is None or y < rows:
+        last = rows is not None and y == rows - 1
+        row = bytearray(wall_row)
+        row[1:2 * columns:2] = bytes([EMPTY]) * columns
+
+        # Join neighbours from different sets at random, or all of them on the last row so the maze is connected
+        parent = list(range(columns))
+        for x in range(columns - 1):
+            a, b = sets[x], sets[x + 1]
+            while parent[a] != a:
+                parent[a] = a = parent[parent[a]]
+            while parent[b] != b:
+                parent[b] = b = parent[parent[b]]
+            if a != b and (last or rng.random() < join_chance):
+                parent[b] = a
+                row[2 * x + 2] = EMPTY
+        for x in range(columns):
+            root = sets[x]
+            while parent[root] != root:
+                root = parent[root]
+            sets[x] = root
+        yield bytes(row)
+
+        if last:
+            break
+
+        # Every set continues downwards through at least one of its cells
+        below = bytearray(wall_row)
+        members = {}
+        for x, cell_set in enumerate(sets):
+            members.setdefault(cell_set, []).append(x)
+        next_sets = [-1] * columns
+        for cell_set, xs in members.items():
+            down = [x for x in xs if rng.random() < down_chance] or [xs[rng.randrange(len(xs))]]
+            for x in down:
+                below[2 * x + 1] = EMPTY
+                next_sets[x] = cell_set
+
+        # Cells not joined from above start sets of their own, with ids no continuing set uses
+        used = set(next_sets)
+        free = (cell_set for cell_set in range(columns) if cell_set not in used)
+        sets = [cell_set if cell_set != -1 else next(free) for cell_set in next_sets]
+        yield bytes(below)
+        y += 1
+
+    # The bottom border, two rows of it for an even height
+    if height is not None:
+        for _ in range(height - 2 * rows):
+            yield wall_row
+
+
+class MazeGenerator(MapGenerator):
+    def __init__(self, width=69, height=15, seekers=10, collectibles=10, density=0.05, seed=None, *, tile_size=None, algorithm=BACKTRACKER):
+        """ Generate perfect mazes with a few walls knocked out for loops, density is the chance of knocking out each remaining wall between two passages """
+        super().__init__(width, height, seekers, collectibles, density, seed, tile_size=tile_size)
+        if algorithm not in (BACKTRACKER, ELLER):
+            raise ValueError(f"Unknown maze algorithm {algorithm!r}, expected {BACKTRACKER!r} or {ELLER!r}")
+        self.algorithm = algorithm
+
+    def params(self):
+        """ Get the parameters that together with a seed fully determine a map """
+        return super().params() + (self.algorithm,)
+
+    @classmethod
+    def fromParams(cls, params, seed=None):
+        """ Create a generator from the parameters returned by params() """
+        width, height, seekers, collectibles, density, tile_size, algorithm = params
+        return cls(width, height, seekers, collectibles, density, seed, tile_size=tile_size, algorithm=algorithm)
+
+    def generateSteps(self, seed=None):
+        """ Generate a maze with start, end, seekers and collectibles, yielding the phase and how far into it the work is """
+        self.startMap(seed)
+        if self.algorithm == ELLER:
+            rows = []
+            for row in self.streamRows():
+                rows.append(row)
+                if len(rows) % ROWS_PER_STEP == 0:
+                    yield 'carve', len(rows) / self.height / 2
+            self.map = TileGrid(self.width, self.height, data=b''.join(rows))
+        else:
+            self.map = TileGrid(self.width, self.height, WALL)
+            for fraction in backtrackerSteps(self.map, self.rng):
+                yield 'carve', fraction / 2
+        self.addStat('loops_opened', (yield from self.loopSteps()))
+
+        # Start and end on the maze cells in opposite corners, a perfect maze joins every cell so no repair is needed
+        start = (1, 1)
+        end = ((self.width - 1) // 2 * 2 - 1, (self.height - 1) // 2 * 2 - 1)
+        self.map[start[1]][start[0]] = START
+        self.map[end[1]][end[0]] = END
+        self.lapStats('carve')
+
+        yield from self.seekerSteps()
+        self.lapStats('seekers')
+        for i in range(self.collectibles):
+            self.placeCollectibles()
+            yield 'collectibles', (i + 1) / self.collectibles
+        self.lapStats('collectibles')
+
+        # Ensure the end can be reached without being heard
+        if self.tile_size is not None:
+            yield from self.solvableSteps()
+            self.lapStats('solver')
+
+        self.finishStats()
+
+    def streamRows(self, endless=False):
+        """ Yield the maze row by row with Eller's algorithm in memory proportional to the width, for the map height or without end """
+        return ellerRows(self.width, None if endless else self.height, self.rng)
+
+    def openLoops(self):
+        """ Knock out walls that sit between two passages, so the player has more than one way around a seeker """
+        return runSteps(self.loopSteps())
+
+    def loopSteps(self):
+        """ The work of openLoops, yielding every ROWS_PER_STEP rows """
+        if self.density <= 0:
+            return 0
+
+        width = self.width
+        cells = self.map.data
+        opened = 0
+        for y in range(1, self.height - 1):
+            for x in range(1 + y % 2, width - 1, 2):
+                i = y * width + x
+                if cells[i] != WALL:
+                    continue
+                horizontal = cells[i - 1] != WALL and cells[i + 1] != WALL
+                vertical = cells[i - width] != WALL and cells[i + width] != WALL
+                if (horizontal or vertical) and self.rng.random() < self.density:
+                    cells[i] = EMPTY
+                    opened += 1
+            if y % ROWS_PER_STEP == 0:
+                yield 'carve', 0.5 + y / self.height / 2
+        return opened
+
+
+if __name__ == '__main__':
+    import sys
+
+    maze = MazeGenerator(algorithm=sys.argv[1] if len(sys.argv) > 1 else BACKTRACKER)
+    maze.generateMap()
+    maze.printMap()
+    if maze.placement_error:
+        print(maze.placement_error)
@@ -0,0 +1,166 @@
+from collections import deque
+from math import lcm
+
+import numpy as np
+
+from tile_grid import WALL, START, END, SEEKER
+
+
+class SeekerSolver:
+    def __init__(self, grid, tile_size, default_radius=10, radius_growth=4, radius_decay=1, max_states=1 << 22, horizon=None):
+        """ Decide whether a map can be won without ever being heard, under the game's noise rules at the given tile size in pixels """
+        self.grid = grid
+        self.tile_width, self.tile_height = tile_size
+        self.default_radius = default_radius
+        self.radius_growth = radius_growth
+        self.radius_decay = radius_decay
+        self.max_states = max_states
+        self.horizon = horizon
+
+        self.walls = grid.array() == WALL
+        self.start = grid.find(START)[0]
+        self.end = grid.find(END)[0]
+        self.seekers = grid.find(SEEKER)
+
+        # Filled in by solve
+        self.ticks = None
+        self.proven = False
+        self.blame = np.zeros(len(self.seekers), dtype=np.int64)
+
+        self.buildPatrols()
+        self.buildProgress()
+
+        # Long enough to walk the shortest route ten times over, waiting for seekers and the noise to die down on the way
+        if self.horizon is None:
+            route = int(self.progress[self.start[1], self.start[0]])
+            if route == self.walls.size:
+                route = 0
+            self.horizon = 10 * max(grid.width + grid.height, route)
+
+    def buildPatrols(self):
+        """ Tabulate where every seeker is on each tick of its patrol, a seeker on a run of n cells repeats every 2n ticks """
+        count = len(self.seekers)
+        self.periods = np.ones(count, dtype=np.int64)
+        for i, (x, y) in enumerate(self.seekers):
+            row = bytes(self.grid.row(y))
+            left = row.rfind(bytes([WALL]), 0, x)
+            right = row.find(bytes([WALL]), x + 1)
+            right = self.grid.width if right == -1 else right
+            self.periods[i] = 2 * (right - left - 1)
+
+        # Step all seekers together like the game does, with the map edges counting as walls
+        walls = np.pad(self.walls, ((0, 0), (1, 1)), constant_values=True)
+        length = int(self.periods.max(initial=1))
+        self.patrol_x = np.empty((length, count), dtype=np.int64)
+        self.patrol_y = np.array([y for _, y in self.seekers], dtype=np.int64)
+        x = np.array([x for x, _ in self.seekers], dtype=np.int64)
+        direction = np.ones(count, dtype=np.int64)
+        for tick in range(length):
+            self.patrol_x[tick] = x
+            new_x = x + direction
+            blocked = walls[self.patrol_y, new_x + 1]
+            direction = np.where(blocked, -direction, direction)
+            x = np.where(blocked, x, new_x)
+
+        # The whole patrol pattern repeats after the least common multiple of the periods
+        self.period = lcm(*self.periods.tolist()) if count else 1
+
+        # Danger tables: the weighted squared distance of every column to every seeker column and of every row to every seeker
+        columns = np.arange(self.grid.width)
+        self.column_distance = (columns[None, :] - columns[:, None]) ** 2 * self.tile_width ** 2
+        self.row_distance = (np.arange(self.grid.height)[None, :] - self.patrol_y[:, None]) ** 2 * self.tile_height ** 2
+
+    def buildProgress(self):
+        """ Walking distance from every open cell to the end, used to tell which seekers stop the player getting closer """
+        width = self.grid.width
+        cells = self.grid.data
+        unreachable = len(cells)
+        progress = [unreachable] * len(cells)
+        origin = self.end[1] * width + self.end[0]
+        progress[origin] = 0
+        queue = deque([origin])
+        while queue:
+            cell = queue.popleft()
+            for neighbour in (cell - 1, cell + 1, cell - width, cell + width):
+                if cells[neighbour] != WALL and progress[neighbour] == unreachable:
+                    progress[neighbour] = progress[cell] + 1
+                    queue.append(neighbour)
+        self.progress = np.array(progress, dtype=np.int64).reshape(self.grid.height, width)
+
+    def seekersAt(self, tick):
+        """ Columns of every seeker after the given number of ticks """
+        return self.patrol_x[tick % self.periods, np.arange(len(self.seekers))]
+
+    def solve(self):
+        """ Search (position, tick) states keeping the quietest way into each, return True if the end can be reached unheard """
+        for _ in self.solveSteps():
+            pass
+        return self.ticks is not None
+
+    def solveSteps(self):
+        """ The search of solve, yielding the tick after every tick so it can be spread over several frames """
+        height, width = self.walls.shape
+        open_cells = ~self.walls
+        half_tile = self.tile_width // 2
+
+        # Noise radius of the quietest way to be on each cell at the current tick, inf where unreachable
+        radius = np.full((height, width), np.inf)
+        radius[self.start[1], self.start[0]] = self.default_radius
+
+        # With a short enough pattern, a state seen before at the same phase with no more noise needs no second look,
+        # which makes the search finite and lets it prove that a map cannot be won
+        exact = self.period <= self.horizon and self.period * height * width <= self.max_states
+        if exact:
+            best = np.full((self.period, height, width), np.inf)
+            best[0] = radius
+
+        self.proven = False
+        self.ticks = None
+        tick = 0
+        while tick < self.horizon or exact:
+            tick += 1
+
+            # The seekers move, then hear everyone closer than the noise radius plus half a tile
+            if len(self.seekers):
+                distance = self.row_distance[:, :, None] + self.column_distance[self.seekersAt(tick)][:, None, :]
+                reach = radius + half_tile
+                heard = (distance.min(axis=0) < reach * reach) & np.isfinite(radius)
+                if heard.any():
+                    radius[heard] = np.inf
+
+                    # Blame the seekers hearing the player where they got closest to the end
+                    closest = heard & (self.progress == self.progress[heard].min())
+                    self.blame += np.bincount(distance[:, closest].argmin(axis=0), minlength=len(self.seekers))
+
+            # Standing on the end unheard wins
+            if np.isfinite(radius[self.end[1], self.end[0]]):
+                self.ticks = tick
+                self.proven = True
+                return True
+
+            # Wait and get quieter, or make one move and get louder
+            moved = radius + self.radius_growth - self.radius_decay
+            next_radius = np.maximum(radius - self.radius_decay, self.default_radius)
+            np.minimum(next_radius[1:, :], moved[:-1, :], out=next_radius[1:, :])
+            np.minimum(next_radius[:-1, :], moved[1:, :], out=next_radius[:-1, :])
+            np.minimum(next_radius[:, 1:], moved[:, :-1], out=next_radius[:, 1:])
+            np.minimum(next_radius[:, :-1], moved[:, 1:], out=next_radius[:, :-1])
+            radius = np.where(open_cells, next_radius, np.inf)
+
+            if exact:
+                phase = best[tick % self.period]
+                radius[radius >= phase] = np.inf
+                np.minimum(phase, radius, out=phase)
+
+            if not np.isfinite(radius).any():
+                # Nowhere left to be: the map cannot be won without being heard
+                self.proven = True
+                return False
+
+            yield tick
+
+        return False
+
+    def mostBlamed(self):
+        """ Position of the seeker that heard the player most often during the last search """
+        return self.seekers[int(self.blame.argmax())]
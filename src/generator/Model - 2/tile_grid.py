@@ -0,0 +1,98 @@
+# Tile codes are the ASCII values of the characters maps are printed and stored with
+WALL = ord('#')
+EMPTY = ord(' ')
+START = ord('S')
+END = ord('E')
+SEEKER = ord('$')
+COIN = ord('C')
+
+
+class TileGrid:
+    def __init__(self, width, height, fill=WALL, data=None):
+        """ A width x height grid of tile codes stored one byte per cell in a flat bytearray """
+        self.width = width
+        self.height = height
+        self.data = bytearray([fill]) * (width * height) if data is None else bytearray(data)
+        if len(self.data) != width * height:
+            raise ValueError(f"Expected {width * height} cells, got {len(self.data)}")
+        self.makeRows()
+
+    def makeRows(self):
+        """ Build the row views, grid[y][x] reads and writes the underlying bytearray """
+        view = memoryview(self.data)
+        self.rows = [view[y * self.width:(y + 1) * self.width] for y in range(self.height)]
+
+    @classmethod
+    def fromRows(cls, rows):
+        """ Build a grid from equally long strings or lists of single characters """
+        rows = [''.join(row) for row in rows]
+        return cls(len(rows[0]), len(rows), data=''.join(rows).encode('ascii'))
+
+    @classmethod
+    def fromBytes(cls, width, height, data):
+        """ Build a grid from its one-byte-per-cell representation """
+        return cls(width, height, data=data)
+
+    def __getstate__(self):
+        return {'width': self.width, 'height': self.height, 'data': bytes(self.data)}
+
+    def __setstate__(self, state):
+        self.width = state['width']
+        self.height = state['height']
+        self.data = bytearray(state['data'])
+        self.makeRows()
+
+    def __len__(self):
+        return self.height
+
+    def __getitem__(self, y):
+        return self.rows[y]
+
+    def __iter__(self):
+        return iter(self.rows)
+
+    def __eq__(self, other):
+        return isinstance(other, TileGrid) and (self.width, self.height, self.data) == (other.width, other.height, other.data)
+
+    def at(self, x, y):
+        """ Tile code at (x, y) """
+        return self.data[y * self.width + x]
+
+    def set(self, x, y, tile):
+        """ Set the tile code at (x, y) """
+        self.data[y * self.width + x] = tile
+
+    def row(self, y):
+        """ Zero-copy view of row y """
+        return self.rows[y]
+
+    def find(self, tile):
+        """ Positions of all cells holding the given tile, in row-major order """
+        positions = []
+        needle = bytes([tile])
+        i = self.data.find(needle)
+        while i != -1:
+            positions.append((i % self.width, i // self.width))
+            i = self.data.find(needle, i + 1)
+        return positions
+
+    def count(self, tile):
+        """ Number of cells holding the given tile """
+        return self.data.count(bytes([tile]))
+
+    def copy(self):
+        """ Independent copy of the grid """
+        return TileGrid(self.width, self.height, data=self.data)
+
+    def array(self):
+        """ Writable height x width NumPy uint8 view sharing memory with the grid """
+        import numpy as np
+        return np.frombuffer(self.data, dtype=np.uint8).reshape(self.height, self.width)
+
+    def tobytes(self):
+        """ One-byte-per-cell representation of the grid """
+        return bytes(self.data)
+
+    def toRows(self):
+        """ The grid as printable strings, one per row """
+        return [bytes(row).decode('ascii') for row in self.rows]
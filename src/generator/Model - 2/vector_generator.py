@@ -0,0 +1,155 @@
+import numpy as np
+
+from generator import MapGenerator
+from tile_grid import TileGrid, WALL, EMPTY, START, END, SEEKER, COIN
+
+
+def labelComponents(open_cells):
+    """ Label the 4-connected components of a boolean grid, walls get label 0 """
+    height, width = open_cells.shape
+
+    # Every horizontal run of open cells becomes one node
+    run_starts = open_cells.copy()
+    run_starts[:, 1:] &= ~open_cells[:, :-1]
+    run_ids = np.cumsum(run_starts.ravel()).reshape(height, width) * open_cells
+    runs = int(run_ids.max())
+
+    # Runs are joined wherever two open cells touch vertically
+    touching = open_cells[:-1] & open_cells[1:]
+    upper = run_ids[:-1][touching]
+    lower = run_ids[1:][touching]
+    pairs = np.unique(upper.astype(np.int64) * (runs + 1) + lower)
+    upper, lower = pairs // (runs + 1), pairs % (runs + 1)
+
+    # Hook larger roots onto smaller ones and compress until every edge agrees
+    labels = np.arange(runs + 1)
+    while True:
+        upper_root, lower_root = labels[upper], labels[lower]
+        differ = upper_root != lower_root
+        if not differ.any():
+            break
+        np.minimum.at(
+            labels,
+            np.maximum(upper_root[differ], lower_root[differ]),
+            np.minimum(upper_root[differ], lower_root[differ])
+        )
+        while True:
+            compressed = labels[labels]
+            if np.array_equal(compressed, labels):
+                break
+            labels = compressed
+
+    return labels[run_ids]
+
+
+class VectorMapGenerator(MapGenerator):
+    def __init__(self, width=68, height=15, seekers=10, collectibles=10, density=0.6, seed=None, *, tile_size=None):
+        super().__init__(width, height, seekers, collectibles, density, seed, tile_size=tile_size)
+        self.cells = None
+
+    def startMap(self, seed):
+        """ Pick the seed of the next map and reset the random number generator to it """
+        super().startMap(seed)
+        self.rng = np.random.default_rng(self.seed)
+
+    def generateSteps(self, seed=None):
+        """ Generate a random map using whole-array operations instead of per-cell loops, yielding between phases """
+        self.startMap(seed)
+        start = (1, 1)
+        end = (self.width - 2, self.height - 2)
+
+        self.map = TileGrid(self.width, self.height, WALL)
+        self.cells = cells = self.map.array()
+
+        # Draw the whole density mask at once
+        inner = self.rng.random((self.height - 2, self.width - 2)) < self.density
+        cells[1:-1, 1:-1][inner] = EMPTY
+
+        # Place start and end positions
+        cells[start[1], start[0]] = START
+        cells[end[1], end[0]] = END
+        self.lapStats('carve')
+        yield 'carve', 1.0
+
+        self.placeSeekers()
+        self.lapStats('seekers')
+        yield 'seekers', 1.0
+        self.placeCollectibles()
+        self.lapStats('collectibles')
+        yield 'collectibles', 1.0
+
+        # Ensure the map is clearable by joining everything the player must reach
+        yield from self.repairSteps([start, end] + self.getAssetPositions())
+        self.lapStats('connectivity')
+
+        # Ensure the end can be reached without being heard
+        if self.tile_size is not None:
+            yield from self.solvableSteps()
+            self.lapStats('solver')
+
+        self.finishStats()
+
+    def seekerCandidates(self):
+        """ Get every empty cell where a seeker could patrol, with the id of its horizontal run """
+        cells = self.cells
+        walls = cells == WALL
+        columns = np.arange(self.width)
+
+        # Nearest wall to the left and to the right of every cell
+        left_wall = np.maximum.accumulate(np.where(walls, columns, -1), axis=1)
+        right_wall = np.minimum.accumulate(np.where(walls, columns, self.width)[:, ::-1], axis=1)[:, ::-1]
+        k = columns - left_wall
+        l = right_wall - columns
+
+        # Same rule as isBetweenClosedWalls: one side of the run must be long enough
+        candidates = (cells == EMPTY) & ((k > 4) | (l > 4))
+        ys, xs = np.nonzero(candidates)
+        runs = ys * self.width + left_wall[ys, xs]
+        return xs.tolist(), ys.tolist(), runs.tolist()
+
+    def placeSeekers(self):
+        """ Place all seekers, recording in placement_error why any could not be placed """
+        positions = self.chooseSeekerPositions(*self.seekerCandidates())
+        for x, y in positions:
+            self.cells[y, x] = SEEKER
+        return len(positions)
+
+    def randomIndex(self, n):
+        """ Pick a random index below n """
+        return int(self.rng.integers(n))
+
+    def placeCollectibles(self):
+        """ Place all collectibles on distinct empty cells in one draw """
+        empty = np.flatnonzero(self.cells == EMPTY)
+        chosen = self.rng.choice(empty, size=min(self.collectibles, len(empty)), replace=False)
+        self.cells.flat[chosen] = COIN
+        self.addStat('collectible_probes', len(chosen))
+
+    def componentLabels(self):
+        """ Label the connected open areas of the map row-major by cell index, walls get label 0, and count their cells """
+        labels = labelComponents(self.cells != WALL).ravel()
+
+        # The labels are union-find roots, renumbered 1, 2, ... so there is one size per area
+        sizes = np.bincount(labels)
+        present = sizes > 0
+        present[0] = True
+        labels = (np.cumsum(present) - 1)[labels]
+        return labels.tolist(), sizes[present].tolist()
+
+    def carve(self, x, y):
+        """ Turn a wall cell into an empty space """
+        self.cells[y, x] = EMPTY
+
+    def reachesAll(self, start, end, assets):
+        """ Check that the end and every asset share a connected component with the start """
+        labels = labelComponents(self.cells != WALL)
+        goals = [end] + list(assets)
+        xs = np.array([goal[0] for goal in goals])
+        ys = np.array([goal[1] for goal in goals])
+        return bool((labels[ys, xs] == labels[start[1], start[0]]).all())
+
+
+if __name__ == '__main__':
+    random_map = VectorMapGenerator()
+    random_map.generateMap()
+    random_map.printMap()
@@ -1,34 +1,104 @@
 import pygame
 import sys
+import argparse
 import json
 import os
-from typing import List, Tuple
+from typing import List, Optional, Tuple
+import logging
+from pathlib import Path
+
+def add_to_path():
+    generator_path = Path('src/generator/Model - 2').resolve()
+    sys.path.append(str(generator_path))
+
+add_to_path()
 from screen_dimension import get_screen_dimensions
-from map_reader import read_grid
+from map_pack import LevelPack
 from display import Display
-from draw_map import GameMap
+from draw_map import GameMap, WorldMap
 from read_theme import read_theme
-
-import logging
-from pathlib import Path
+from tile_grid import TileGrid
+from vector_generator import VectorMapGenerator
+from maze_generator import MazeGenerator, BACKTRACKER, ELLER
+from map_prefetcher import MapPrefetcher
+from map_cache import MapCache
+from adaptive_tuner import AdaptiveTuner
+from chunk_world import ChunkGenerator, ChunkWorld
+from world import WorldGame
+from simulation import GameState, newGame, step, LEFT, RIGHT, UP, DOWN
+from frame_timer import FrameTimer, COLUMNS, PERCENTILES, INPUT, DRAW_GRID, DRAW_TASKBAR, PRESENT
+from flight_recorder import FlightRecorder, FRAME_GAMEPLAY, FRAME_WIN, TICK, SEEKER_COLLISION, COIN_COLLECTED, GAME_WON, NEW_MAP, MENU, OVERLAY_TOGGLED
 
 logging.basicConfig(
-    level=logging.DEBUG,
+    level=logging.INFO,
     format='%(asctime)s - %(levelname)s - %(message)s'
 )
 
-def add_to_path():
-    generator_path = Path('src/generator/Model - 2').resolve()
-    sys.path.append(str(generator_path))
+# Arrow keys and the moves they make in the simulation
+MOVES = {
+    pygame.K_LEFT: LEFT,
+    pygame.K_RIGHT: RIGHT,
+    pygame.K_UP: UP,
+    pygame.K_DOWN: DOWN
+}
 
-add_to_path()
-from generator import MapGenerator
+# Longest frame the simulation catches up on, so a stall does not cause a burst of ticks
+MAX_FRAME_TIME = 0.25
+
+# Frames between refreshes of the performance overlay
+OVERLAY_INTERVAL = 30
+
+# Where flight recorder dumps are written, on a crash, on F12 and on exit, only the newest are kept
+FLIGHT_RECORDS = Path('src') / 'flight_records'
+
+# Rows of square tiles shown in the endless world, the columns follow from the screen's aspect ratio
+WORLD_ROWS = 24
+
+# Seconds of map generation per frame while a map is generated in the game's process, the rest is left to drawing and input
+LOADING_BUDGET = 0.010
+
+# Where the adaptive generator remembers the settings it settled on for this machine
+GENERATOR_PROFILE = Path('src') / 'generator_profile.json'
 
 class SeekerGame:
-    def __init__(self) -> None:
+    def __init__(
+            self,
+            seed: Optional[int] = None,
+            dirty_rects: bool = False,
+            tick_rate: float = 10,
+            frame_rate: int = 60,
+            uncapped: bool = False,
+            timings_path: Optional[str] = None,
+            world: bool = False,
+            maze: Optional[str] = None,
+            pack: Optional[str] = None,
+            target_latency: Optional[float] = None,
+            difficulty: Tuple[float, float] = (1.0, 2.5)
+        ) -> None:
+
         """
         Initialize the SeekerGame class by setting up the 
         Game environment, load stages, load theme, and the map.
+
+        Args:
+            seed (int): Seed for the sequence of maps. Seeded sequences are handed out in
+                the same order every run, and cached on disk after the first generation.
+                With target_latency the maps also depend on how the tuning goes.
+            dirty_rects (bool): Present only the screen areas that changed each
+                frame instead of flipping the whole screen.
+            tick_rate (float): Simulation ticks per second, independent of the frame rate.
+            frame_rate (int): Frames rendered per second. Input is read every frame.
+            uncapped (bool): Render as fast as possible, for benchmarking.
+            timings_path (str): File the per-frame phase timings are written to on exit,
+                as CSV if it ends in .csv and as JSON otherwise.
+            world (bool): Play one endless world streamed in chunks around the player,
+                seen through a camera that follows them, instead of a sequence of maps.
+            maze (str): Play perfect mazes carved by this algorithm, 'backtracker' or 'eller',
+                instead of open caves.
+            pack (str): Play the levels of this level pack in order instead of generated maps.
+            target_latency (float): Generation time in seconds each map should stay within. When
+                given, density, seekers and coins are tuned to this machine and remembered in a profile.
+            difficulty (Tuple[float, float]): Fewest and most seekers per 100 open tiles the tuning keeps to.
         """
 
         # Initialize pygame
@@ -48,29 +118,64 @@ class SeekerGame:
         self.screen_width, self.screen_height = get_screen_dimensions()
         logging.info(f"Screen Dimensions fetched {self.screen_height} x {self.screen_width}")
         
-        # Initialize Map Generatore
-        self.map_generator = MapGenerator()
-        self.map_generator.generateMap()
-        logging.debug("Map Generated")
-
-        # Load initial grid
-        self.grid: List[List[str]] = self.map_generator.map
-        self.rows: int = len(self.grid)
-        self.cols: int = len(self.grid[0])
-        
-        # Calculate tile sizes
-        self.x_size: float = self.screen_width / self.cols
-        self.y_size: float = self.screen_height / self.rows
+        self.world: Optional[WorldGame] = None
+        self.world_map: Optional[WorldMap] = None
+        self.map_prefetcher: Optional[MapPrefetcher] = None
+        self.map_tuner: Optional[AdaptiveTuner] = None
+        self.level_pack: Optional[LevelPack] = None
+        self.level: int = -1
+
+        if world:
+            # Square tiles, and chunks generated around the player as they explore
+            tile_size = self.screen_height // WORLD_ROWS
+            self.rows: int = WORLD_ROWS
+            self.cols: int = self.screen_width // tile_size
+            self.x_size: float = tile_size
+            self.y_size: float = tile_size
+            self.world = WorldGame(ChunkWorld(ChunkGenerator(seed=seed)), tile_size, tile_size, (self.cols, self.rows))
+            self.grid: TileGrid = self.world.state.grid
+            logging.info("World Generated")
+
+        else:
+            if pack is not None:
+                # Levels are read from the pack one at a time as they are played
+                self.level_pack = LevelPack(pack)
+                if not len(self.level_pack):
+                    self.level_pack.close()
+                    raise ValueError(f"{pack} has no levels")
+                logging.info(f"Level pack of {len(self.level_pack)} levels opened")
+
+            else:
+                # Initialize Map Generatore and the pool that prepares the next maps
+                self.map_generator = VectorMapGenerator() if maze is None else MazeGenerator(algorithm=maze)
+
+                # Maps are proven winnable past the seekers at the tile size they are shown at
+                self.map_generator.tile_size = (self.screen_width // self.map_generator.width, self.screen_height // self.map_generator.height)
+                map_cache = None if seed is None else MapCache(Path('src') / 'map_cache')
+                if target_latency is not None:
+                    self.map_tuner = AdaptiveTuner(self.map_generator, target_latency, difficulty, profile=GENERATOR_PROFILE)
+                    logging.info(f"Adaptive generation starting from {self.map_tuner.summary()}")
+                self.map_prefetcher = MapPrefetcher(self.map_generator, seed=seed, cache=map_cache, tuner=self.map_tuner)
+                logging.debug("Map Generated")
+
+            # Load initial grid
+            self.grid: TileGrid = self.next_grid()
+            self.rows: int = self.grid.height
+            self.cols: int = self.grid.width
+
+            # Calculate tile sizes
+            self.x_size: float = self.screen_width / self.cols
+            self.y_size: float = self.screen_height / self.rows
         
         # Set up the initial screen
         self.display: Display = Display(self.screen_width, self.screen_height, self.x_size, self.y_size, self.theme)
         self.game_map: GameMap = GameMap(self.grid, self.x_size, self.y_size, self.theme)
+        if self.world is not None:
+            self.world_map = WorldMap(self.world.world, int(self.x_size), int(self.y_size), self.theme)
         logging.debug("Screen Initialised")
         
-        # Set up player attributes
-        self.player_pos: List[int]
-        self.seeker_positions: List[List[int]]
-        self.player_pos, self.seeker_positions, self.coin_positions = self.game_map.resetGame()
+        # Set up the simulation of the level
+        self.state: GameState = self.world.state if self.world is not None else newGame(self.grid, int(self.x_size), int(self.y_size))
         self.clock: pygame.time.Clock = pygame.time.Clock()
         logging.info("Entities initialised")
 
@@ -78,14 +183,61 @@ class SeekerGame:
         self.running: bool = True
         self.game_won: bool = False
         self.all_levels_cleared: bool = False
-        
-        # Initial circle radius
-        self.default_radius = 10
-        self.initial_circle_radius: int = 10
+
+        # Presentation: full flips, or only the areas that changed this frame
+        self.dirty_rects: bool = dirty_rects
+        self.full_redraw: bool = True
+        self.full_frame: bool = True
+        self.frame_rects: List[pygame.Rect] = []
+
+        # Fixed-timestep simulation, rendered in between ticks
+        self.tick_length: float = 1 / tick_rate
+        self.frame_rate: int = 0 if uncapped else frame_rate
+        self.accumulator: float = 0.0
+        self.moves: List[Tuple[int, int]] = []
+        self.previous: Tuple = self.snapshot()
+
+        # Per-frame phase timings and the overlay showing them, toggled with F3
+        self.frame_timer: FrameTimer = FrameTimer()
+        self.timings_path: Optional[str] = timings_path
+        self.show_overlay: bool = False
+        self.overlay_table: List[List[str]] = []
+
+        # Per-frame events go to an in-memory flight recorder, logging is kept for lifecycle events
+        self.flight_recorder: FlightRecorder = FlightRecorder()
+
+        # Screenshot counter
         self.n = 0
 
-        # Coin Tracker
-        self.coins = 0
+    def snapshot(self) -> Tuple:
+        """
+        Capture the positions to interpolate from until the next tick, in world tiles in the endless world.
+        A tick replaces the seeker arrays instead of writing into them, so they are not copied.
+
+        Returns:
+            Tuple: Player position, seeker columns and rows, and the circle radius.
+        """
+        x, y = self.world.origin if self.world is not None else (0, 0)
+        state = self.state
+        return [state.player[0] + x, state.player[1] + y], state.seeker_x + x, state.seeker_y + y, state.radius
+
+    def interpolate(self, alpha: float) -> Tuple[Tuple[float, float], List[Tuple[float, float]], float]:
+        """
+        Blend the previous and the current tick for rendering.
+
+        Args:
+            alpha (float): How far the current frame is between the two ticks, from 0 to 1.
+
+        Returns:
+            Tuple: Player position, seeker positions and circle radius to draw.
+        """
+        player, seeker_x, seeker_y, radius = self.previous
+        current_player, current_x, current_y, current_radius = self.snapshot()
+        player = (player[0] + (current_player[0] - player[0]) * alpha, player[1] + (current_player[1] - player[1]) * alpha)
+        seeker_x = seeker_x + (current_x - seeker_x) * alpha
+        seeker_y = seeker_y + (current_y - seeker_y) * alpha
+        radius = radius + (current_radius - radius) * alpha
+        return player, list(zip(seeker_x.tolist(), seeker_y.tolist())), radius
 
     def take_screenshot(self, filename: str) -> None:
         """
@@ -102,18 +254,18 @@ class SeekerGame:
         while True:
             self.display.screen.fill(self.theme['BACKGROUND_COLOR'])
 
-            font = pygame.font.SysFont(None, 74)
-            title = font.render('Sneak', True, (255, 0, 0))
+            font = self.display.getFont(None, 74)
+            title = self.display.renderText(font, 'Sneak', (255, 0, 0))
             self.display.screen.blit(title, (self.screen_width // 2 - title.get_width() // 2, self.screen_height // 2 - title.get_height() // 2 - 100))
 
-            font = pygame.font.SysFont(None, 50)
-            prompt1 = font.render('Press SPACE to Start or ESC to Quit', True, self.theme['TEXT_COLOR'])
+            font = self.display.getFont(None, 50)
+            prompt1 = self.display.renderText(font, 'Press SPACE to Start or ESC to Quit', self.theme['TEXT_COLOR'])
             self.display.screen.blit(prompt1, (self.screen_width // 2 - prompt1.get_width() // 2, self.screen_height // 2))
 
-            prompt2 = font.render('THE GAME IS STILL UNDER DEVELOPMENT AND MAY HAVE SOME BUGS', True, (255, 0, 0))
+            prompt2 = self.display.renderText(font, 'THE GAME IS STILL UNDER DEVELOPMENT AND MAY HAVE SOME BUGS', (255, 0, 0))
             self.display.screen.blit(prompt2, (self.screen_width // 2 - prompt2.get_width() // 2, self.screen_height // 2 + 50))
 
-            prompt3 = font.render('Press R to restart the game or move to a new map', True, self.theme['TEXT_COLOR'])
+            prompt3 = self.display.renderText(font, 'Press R to restart the game or move to a new map', self.theme['TEXT_COLOR'])
             self.display.screen.blit(prompt3, (self.screen_width // 2 - prompt3.get_width() // 2, self.screen_height // 2 + 100))
 
             pygame.display.flip()
@@ -121,37 +273,16 @@ class SeekerGame:
             for event in pygame.event.get():
                 if event.type == pygame.KEYDOWN:
                     if event.key == pygame.K_SPACE:
+                        self.full_redraw = True
                         return
                     
                     elif event.key == pygame.K_ESCAPE:
                         logging.debug("Exiting Game....")
-                        pygame.quit()
-                        sys.exit()
+                        self.shutdown()
 
                     elif event.key == pygame.K_r:
-                        # Reset coins
-                        self.coins = 0
-
                         # Generate new Map
-                        self.map_generator.generateMap()
-                        self.grid = self.map_generator.map
-                        self.game_map.coins_collected, self.game_map.seekers_collisions, self.start_time = 0, 0, pygame.time.get_ticks()
-                        logging.info("New Map Generated")
-
-                        self.game_map.grid = self.grid
-                        # Get new map dimensions
-                        self.rows, self.cols = len(self.grid), len(self.grid[0])
-                        # Calculate tile size
-                        self.x_size = self.screen_width / self.cols
-                        self.y_size = self.screen_height / self.rows
-
-                        # Update the screen to display new map
-                        self.display.updateScreenSize(self.cols, self.rows)
-                        self.player_pos, self.seeker_positions, self.coin_positions = self.game_map.resetGame()
-
-
-                        logging.info("New Map Set")
-                        self.game_won = False
+                        self.new_map()
 
                     elif event.key == pygame.K_1:
                         self.take_screenshot(f"screenshot{self.n}.png")
@@ -160,41 +291,198 @@ class SeekerGame:
 
                 elif event.type == pygame.QUIT:
                     logging.info("Exiting Game....")
-                    pygame.quit()
-                    sys.exit()
+                    self.shutdown()
 
     def run(self) -> None:
-        self.main_menu()
-        logging.debug("Main Menu Initialised")
+        try:
+            self.main_menu()
+            logging.debug("Main Menu Initialised")
+
+            self.start_time = pygame.time.get_ticks()
+            while self.running:
+                self.frame_timer.start()
+
+                # The win screen, the first frame after a menu and the scrolling world need the whole screen
+                self.full_frame = self.game_won or self.full_redraw or not self.dirty_rects or self.world is not None
+                self.full_redraw = False
+                if self.full_frame:
+                    self.display.screen.fill(self.theme['BACKGROUND_COLOR'])
+                self.frame_rects = []
+
+                # Calculate elapsed time
+                if not self.game_won:
+                    elapsed_time = (pygame.time.get_ticks() - self.start_time) // 1000
+                    formatted_time = f"{elapsed_time // 60:02}:{elapsed_time % 60:02}"
+
+                # Check Game winning conditions
+                if self.game_won:
+                    self.handle_win()
+                    self.flight_recorder.record(FRAME_WIN)
+
+                else:
+                    self.handle_gameplay()
+                    self.flight_recorder.record(FRAME_GAMEPLAY)
+
+                # Draw taskbar with updated info
+                if not self.game_won:
+                    self.frame_rects.append(self.display.drawTaskbar(self.state.coins_collected, self.state.seekers_collisions, formatted_time))
+                    self.frame_timer.lap(DRAW_TASKBAR)
+
+                    if self.show_overlay:
+                        self.frame_rects.append(self.display.drawOverlay(self.overlay_rows()))
+                        self.frame_timer.skip()
+
+                if self.full_frame:
+                    pygame.display.flip()
+                else:
+                    pygame.display.update(self.frame_rects)
+                self.frame_timer.lap(PRESENT)
+                self.frame_timer.end()
+
+                # Bank real time for the simulation, which runs in whole ticks
+                self.accumulator += min(self.clock.tick(self.frame_rate) / 1000, MAX_FRAME_TIME)
+
+        except Exception:
+            # Keep the events that led up to the crash
+            path = self.flight_recorder.dump(FLIGHT_RECORDS, 'crash')
+            logging.exception(f"Game crashed, flight recorder dumped to {path}")
+            raise
+
+        self.shutdown()
+
+    def shutdown(self) -> None:
+        """
+        Stop the map workers, write the frame timings if asked to, and quit.
+        """
+        if self.map_prefetcher is not None:
+            logging.info(f"Map prefetch stats: {self.map_prefetcher.stats()}")
+            self.map_prefetcher.close()
+        if self.map_tuner is not None:
+            logging.info(f"Adaptive generation settled on {self.map_tuner.summary()}")
+            self.map_tuner.save()
+        if self.world is not None:
+            logging.info(f"World chunk stats: {self.world.world.stats()}")
+        if self.level_pack is not None:
+            self.level_pack.close()
+
+        if self.timings_path is not None:
+            self.frame_timer.export(self.timings_path)
+            logging.info(f"Frame timings saved to {self.timings_path}")
+
+        path = self.flight_recorder.dump(FLIGHT_RECORDS, 'exit')
+        logging.info(f"Flight recorder dumped to {path}")
 
-        self.start_time = pygame.time.get_ticks()
-        while self.running:
-            self.display.screen.fill(self.theme['BACKGROUND_COLOR'])
+        pygame.quit()
+        sys.exit()
 
-            # Calculate elapsed time
-            if not self.game_won:
-                elapsed_time = (pygame.time.get_ticks() - self.start_time) // 1000
-                formatted_time = f"{elapsed_time // 60:02}:{elapsed_time % 60:02}"
+    def overlay_rows(self) -> List[List[str]]:
+        """
+        Get the table shown by the performance overlay, refreshed every few frames.
 
-            # Check Game winning conditions
-            if self.game_won:
-                self.handle_win()
-                logging.info("Winning Conditions Checked")
+        Returns:
+            List[List[str]]: The p50, p95 and p99 time of every phase in milliseconds, one row each.
+        """
+        if not self.overlay_table or self.frame_timer.index % OVERLAY_INTERVAL == 0:
+            percentiles = self.frame_timer.percentiles()
+            self.overlay_table = [['ms'] + [f'p{p}' for p in PERCENTILES]]
+            self.overlay_table += [[name] + [f'{value:.2f}' for value in percentiles[name]] for name in COLUMNS]
+        return self.overlay_table
 
-            else:
-                self.handle_gameplay()
-                logging.info("Game Mechanics Handled")
+    def next_grid(self) -> TileGrid:
+        """
+        Get the next map: the next level of the pack, starting over after the last, or the next generated map.
+
+        Returns:
+            TileGrid: The next game grid.
+        """
+        if self.level_pack is not None:
+            self.level = (self.level + 1) % len(self.level_pack)
+            return self.level_pack.grid(self.level)
+        return self.map_prefetcher.get()
+
+    def load_map(self) -> Optional[TileGrid]:
+        """
+        Get the next map. When no map is ready it is generated a slice at a time between
+        frames that show its progress, so the window keeps responding and ESC can cancel it.
 
-            # Draw taskbar with updated info
-            if not self.game_won:
-                self.display.drawTaskbar(self.game_map.coins_collected, self.game_map.seekers_collisions, formatted_time)
+        Returns:
+            TileGrid: The next game grid, None if the player cancelled.
+        """
+        if self.map_prefetcher is None:
+            return self.next_grid()
+
+        grid = self.map_prefetcher.take()
+        if grid is not None:
+            return grid
+
+        # The loading screen covers the level, which is drawn in full again afterwards
+        builder = self.map_prefetcher.build()
+        self.full_redraw = True
+        logging.info("No map ready, generating one")
+        while not builder.step(LOADING_BUDGET):
+            # The worker may finish this map before it is done here
+            grid = self.map_prefetcher.take()
+            if grid is not None:
+                builder.cancel()
+                return grid
+
+            for event in pygame.event.get():
+                if event.type == pygame.KEYDOWN and event.key == pygame.K_ESCAPE:
+                    builder.cancel()
+                    logging.info("Map generation cancelled")
+                    return None
+
+                elif event.type == pygame.QUIT:
+                    builder.cancel()
+                    logging.info("Exiting Game....")
+                    self.shutdown()
 
+            self.display.showLoadingScreen(builder.progress, builder.phase)
             pygame.display.flip()
-            self.clock.tick(10)
+            self.clock.tick(self.frame_rate)
 
-        pygame.quit()
-        sys.exit()
+        return self.map_prefetcher.claim(builder)
+
+    def new_map(self) -> None:
+        """
+        Replace the current level with the next map and start it from scratch, or keep
+        the current one if generating the next map is cancelled.
+        In the endless world, move on to the next world.
+        """
+        if self.world is not None:
+            self.world.reset()
+            self.world_map.clear()
+            self.state = self.world.state
+            logging.info("New World Generated")
+
+        else:
+            grid = self.load_map()
+            if grid is None:
+                return
+            self.grid = grid
+            logging.info("New Map Generated")
+
+            # Get new map dimensions
+            self.rows, self.cols = self.grid.height, self.grid.width
+
+            # Calculate tile size
+            self.x_size = self.screen_width / self.cols
+            self.y_size = self.screen_height / self.rows
+
+            # Update the screen to display new map
+            self.display.updateScreenSize(self.cols, self.rows)
+            self.game_map.grid = self.grid
+            self.game_map.x_size, self.game_map.y_size = self.x_size, self.y_size
+            self.state = newGame(self.grid, int(self.x_size), int(self.y_size))
+
+        self.start_time = pygame.time.get_ticks()
+        self.flight_recorder.record(NEW_MAP)
+        self.accumulator = 0.0
+        self.moves = []
+        self.previous = self.snapshot()
+        self.game_won = False
 
+        logging.info("New Map Set")
 
     def handle_win(self) -> None:
         """
@@ -209,9 +497,9 @@ class SeekerGame:
         self.display.showWinScreen(
             self.cols, 
             self.rows, 
-            self.game_map.seekers_collisions, 
+            self.state.seekers_collisions, 
             self.time_taken, 
-            self.game_map.coins_collected
+            self.state.coins_collected
         )
 
         for event in pygame.event.get():
@@ -219,30 +507,8 @@ class SeekerGame:
 
                 # If user continues to the next stage
                 if event.key == pygame.K_SPACE:
-                    # Reset Coins
-                    self.coins = 0
-
                     # Read next stage map
-                    self.map_generator.generateMap()
-                    self.grid = self.map_generator.map
-                    self.game_map.grid = self.grid
-                    self.game_map.coins_collected, self.game_map.seekers_collisions, self.start_time = 0, 0, pygame.time.get_ticks()
-                    logging.debug("New Map Generated")
-
-                    # Get new map dimensions
-                    self.rows, self.cols = len(self.grid), len(self.grid[0])
-
-                    # Calculate tile size
-                    self.x_size = self.screen_width / self.cols
-                    self.y_size = self.screen_height / self.rows
-
-                    # Update the screen to display new map
-                    self.display.updateScreenSize(self.cols, self.rows)
-                    self.player_pos, self.seeker_positions, self.coin_positions = self.game_map.resetGame()
-                    self.game_won = False
-                        
-                    logging.debug("New Map Set")
-                    self.initial_circle_radius = self.default_radius
+                    self.new_map()
 
                 elif event.key == pygame.K_ESCAPE:
                     # User wants to end game
@@ -251,28 +517,8 @@ class SeekerGame:
                     logging.info("Main Menu Set")
 
                 elif event.key == pygame.K_r:
-                    # Reset Coins
-                    self.coins = 0
-
                     # Generate New Map
-                    self.map_generator.generateMap()
-                    self.grid = self.map_generator.map
-                    self.game_map.grid = self.grid
-                    self.game_map.coins_collected, self.game_map.seekers_collisions, self.start_time = 0, 0, pygame.time.get_ticks()
-                    logging.info("New Map Generated")
-                    # Get new map dimensions
-                    self.rows, self.cols = len(self.grid), len(self.grid[0])
-
-                    # Calculate tile size
-                    self.x_size = self.screen_width / self.cols
-                    self.y_size = self.screen_height / self.rows
-
-                    # Update the screen to display new map
-                    self.display.updateScreenSize(self.cols, self.rows)
-                    self.player_pos, self.seeker_positions, self.coin_positions = self.game_map.resetGame()
-                    self.game_won = False
-                             
-                    logging.info("New Map Set")
+                    self.new_map()
             
                 elif event.key == pygame.K_1:
                         self.take_screenshot(f"screenshot{self.n}.png")
@@ -290,32 +536,8 @@ class SeekerGame:
         drawing the map, updating seeker movements, and handling player input.
         """
 
-        # Update current game with new positions
-        self.game_map.drawGrid(self.display.screen, self.player_pos, self.seeker_positions, self.coin_positions, self.initial_circle_radius)
-        self.game_map.updateSeekers()
-        logging.debug("Seeker Movements Handled")
-
-        # Check Collisions
-        seeker_collision, coin_collision = self.game_map.checkCollisions(self.player_pos, self.seeker_positions, self.initial_circle_radius, self.x_size, self.y_size)
-        logging.debug("Collisions Handled")
-
-        if seeker_collision:
-            # Check Collisions -> Passed
-            self.initial_circle_radius = 10
-            self.player_pos, self.seeker_positions, self.coin_positions = self.game_map.resetGame()
-            logging.info("Seekers Position Updated")
-
-        if coin_collision:
-            self.coins += 1
-
-        # Check if player reach end
-        if self.grid[self.player_pos[1]][self.player_pos[0]] == 'E':
-            # Check -> Passed
-            self.game_won = True
-            elapsed_time = (pygame.time.get_ticks() - self.start_time) // 1000
-            self.time_taken = f"{elapsed_time // 60:02}:{elapsed_time % 60:02}"
-            logging.debug("Game Won")
-
+        # Collect the player's moves and commands every frame, moves wait for the next tick
+        load_new_map = False
         for event in pygame.event.get():
 
             if event.type == pygame.QUIT:
@@ -324,60 +546,124 @@ class SeekerGame:
                 logging.debug("Exiting Game...w")
 
             elif event.type == pygame.KEYDOWN:
-                # Update player position
-                new_pos: List[int] = self.player_pos[:]
-                if event.key == pygame.K_LEFT:
-                    new_pos[0] -= 1
-                elif event.key == pygame.K_RIGHT:
-                    new_pos[0] += 1
-                elif event.key == pygame.K_UP:
-                    new_pos[1] -= 1
-                elif event.key == pygame.K_DOWN:
-                    new_pos[1] += 1
-                if self.grid[new_pos[1]][new_pos[0]] != '#':
-                    self.player_pos = new_pos
-
-                    # Update circle radius
-                    self.initial_circle_radius += 4
-                logging.debug("Player Movements Handled")
-
-                if event.key == pygame.K_ESCAPE:
+                if event.key in MOVES:
+                    self.moves.append(MOVES[event.key])
+
+                elif event.key == pygame.K_ESCAPE:
+                    self.flight_recorder.record(MENU)
                     self.main_menu()
 
                 elif event.key == pygame.K_r:
-                    # Reset coins
-                    self.coins += 1
-
-                    # Genrate New Map
-                    self.map_generator.generateMap()
-                    self.grid = self.map_generator.map
-                    self.game_map.grid = self.grid
-                    self.game_map.coins_collected, self.game_map.seekers_collisions, self.start_time = 0, 0, pygame.time.get_ticks()
-                    logging.debug("New Map Generated")
-
-                    # Get new map dimensions
-                    self.rows, self.cols = len(self.grid), len(self.grid[0])
-
-                    # Calculate tile size
-                    self.x_size = self.screen_width / self.cols
-                    self.y_size = self.screen_height / self.rows
-                    
-                    # Update the screen to display new map
-                    self.display.updateScreenSize(self.cols, self.rows)
-                    self.player_pos, self.seeker_positions, self.coin_positions = self.game_map.resetGame()
-                    self.game_won = False
+                    load_new_map = True
+
+                elif event.key == pygame.K_F3:
+                    # Hiding the overlay needs the map underneath redrawn
+                    self.show_overlay = not self.show_overlay
+                    self.flight_recorder.record(OVERLAY_TOGGLED, int(self.show_overlay))
+                    if not self.show_overlay:
+                        self.full_redraw = True
 
-                    logging.debug("New Map Set")
+                elif event.key == pygame.K_F12:
+                    path = self.flight_recorder.dump(FLIGHT_RECORDS, 'hotkey')
+                    logging.info(f"Flight recorder dumped to {path}")
 
                 elif event.key == pygame.K_1:
                     self.take_screenshot(f"screenshot{self.n}.png")
                     self.n += 1
                     logging.info("Screenshot taken")
 
-        if not self.game_won:
-            self.initial_circle_radius = max(self.default_radius, self.initial_circle_radius - 1)
+        self.frame_timer.lap(INPUT)
+
+        # Advance the simulation by as many ticks as the banked time allows
+        while self.accumulator >= self.tick_length and not self.state.won:
+            self.accumulator -= self.tick_length
+
+            # In the endless world, the simulation moves onto the chunks around the player before the tick
+            if self.world is not None and self.world.follow():
+                self.state = self.world.state
+
+            self.previous = self.snapshot()
+            step(self.state, self.moves, self.frame_timer)
+            self.moves = []
+            self.flight_recorder.record(TICK, self.state.tick)
+
+            if self.state.seeker_collision:
+                # Jump back to the start instead of sliding there
+                self.previous = self.snapshot()
+                self.flight_recorder.record(SEEKER_COLLISION, self.state.seekers_collisions)
+
+            if self.state.collected_coin:
+                x, y = self.state.collected_coin
+                if self.world is not None:
+                    self.world_map.patchTile(*self.world.collect())
+                else:
+                    self.game_map.patchTile(x, y)
+                self.flight_recorder.record(COIN_COLLECTED, y * 65536 + x)
+
+        # Check if player reach end
+        if self.state.won:
+            # Check -> Passed
+            self.game_won = True
+            self.accumulator = 0.0
+            elapsed_time = (pygame.time.get_ticks() - self.start_time) // 1000
+            self.time_taken = f"{elapsed_time // 60:02}:{elapsed_time % 60:02}"
+            self.flight_recorder.record(GAME_WON, self.state.tick)
+            logging.info("Game Won")
+
+        self.frame_timer.skip()
+
+        # Draw the level in between the last two ticks
+        player, seekers, radius = self.interpolate(min(self.accumulator / self.tick_length, 1.0))
+        if self.world is not None:
+            self.frame_rects = self.world_map.drawWorld(self.display.screen, player, seekers, radius)
+        else:
+            self.frame_rects = self.game_map.drawGrid(self.display.screen, player, seekers, radius, self.full_frame)
+        self.frame_timer.lap(DRAW_GRID)
+
+        if load_new_map:
+            # Genrate New Map
+            self.new_map()
+
+def positive_float(text: str) -> float:
+    """
+    Parse a command line option that has to be above 0.
+
+    Args:
+        text (str): The option's value.
+
+    Returns:
+        float: The value.
+    """
+    value = float(text)
+    if value <= 0:
+        raise argparse.ArgumentTypeError(f"must be above 0, got {value}")
+    return value
 
 if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Sneak past the seekers.')
+    parser.add_argument('--world', action='store_true', help='play one endless world instead of a sequence of maps')
+    parser.add_argument('--maze', choices=(BACKTRACKER, ELLER), help='play perfect mazes carved by this algorithm')
+    parser.add_argument('--pack', help='play the levels of a level pack made by bake_maps.py, in order')
+    parser.add_argument('--seed', type=int, help='seed for reproducible maps or worlds')
+    parser.add_argument('--target-ms', type=float, help='tune density, seekers and coins so maps generate within this many milliseconds on this machine')
+    parser.add_argument('--difficulty', type=float, nargs=2, default=(1.0, 2.5), metavar=('LOW', 'HIGH'), help='seekers per 100 open tiles the tuning keeps to, default 1 to 2.5')
+    parser.add_argument('--tick-rate', type=positive_float, default=10, help='simulation ticks per second, independent of the frame rate, default 10')
+    parser.add_argument('--uncapped', action='store_true', help='render as fast as possible instead of at 60 frames per second, for benchmarking')
+    parser.add_argument('--dirty-rects', action='store_true', help='present only the parts of the screen that changed each frame instead of the whole screen')
+    parser.add_argument('--timings', metavar='PATH', help='write the per-frame phase timings to this file on exit, as CSV if it ends in .csv and as JSON otherwise')
+    args = parser.parse_args()
+
     logging.info("Starting Game...")
-    game = SeekerGame()
+    game = SeekerGame(
+        seed=args.seed,
+        dirty_rects=args.dirty_rects,
+        tick_rate=args.tick_rate,
+        uncapped=args.uncapped,
+        timings_path=args.timings,
+        world=args.world,
+        maze=args.maze,
+        pack=args.pack,
+        target_latency=None if args.target_ms is None else args.target_ms / 1000,
+        difficulty=tuple(args.difficulty)
+    )
     game.run()
@@ -0,0 +1,277 @@
+import time
+import random
+import logging
+import threading
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+from typing import Any, Dict, Optional, Tuple, Type
+
+from vector_generator import VectorMapGenerator
+from adaptive_tuner import AdaptiveTuner
+from map_builder import MapBuilder
+from map_cache import MapCache
+from tile_grid import TileGrid
+
+
+def generateMap(
+        generator_class: Type[VectorMapGenerator],
+        params: Tuple,
+        seed: int,
+        cache_directory: Optional[str] = None
+    ) -> Tuple[TileGrid, float, Optional[Dict[str, Any]]]:
+
+    """
+    Generate a single map inside a worker process.
+
+    Args:
+        generator_class (Type): The generator the map is built with, e.g. VectorMapGenerator or MazeGenerator.
+        params (Tuple): The generator's params(), e.g. width, height, seekers, collectibles and density of the map.
+        seed (int): Independent seed for this map.
+        cache_directory (str): Map cache to load from and store into, if any.
+
+    Returns:
+        Tuple: The generated map, the time it took to generate in seconds, and the
+        generator's stats, None when the map came from the cache.
+    """
+    started = time.perf_counter()
+    generator = generator_class.fromParams(params)
+    hit = False
+    if cache_directory is None:
+        generator.generateMap(seed)
+    else:
+        hit = MapCache(cache_directory).generate(generator, seed)
+    return generator.map, time.perf_counter() - started, None if hit else generator.stats
+
+
+class MapPrefetcher:
+    def __init__(
+        self,
+        generator: VectorMapGenerator,
+        depth: int = 3,
+        workers: int = 2,
+        seed: Any = None,
+        cache: Optional[MapCache] = None,
+        tuner: Optional[AdaptiveTuner] = None
+    ) -> None:
+        """
+        Keep a bounded queue of maps generated ahead by a pool of worker processes,
+        handed out in the order their seeds were drawn.
+
+        Args:
+            generator (VectorMapGenerator): Generator used for the map parameters and as synchronous fallback.
+            depth (int): Number of maps kept ready or in progress at any time.
+            workers (int): Number of worker processes.
+            seed (Any): Seed for the sequence every map seed is drawn from.
+            cache (MapCache): On-disk cache for maps, so a seeded sequence is only ever generated once.
+            tuner (AdaptiveTuner): Tunes the generator from the stats of every map, new jobs
+                are submitted with the generator's parameters at that moment.
+        """
+        self.generator = generator
+        self.depth = depth
+        self.workers = workers
+        self.seeds = random.Random(seed)
+        self.cache = cache
+        self.tuner = tuner
+
+        # Jobs in the order their seeds were drawn, maps are always handed out oldest first so a seeded sequence
+        # does not depend on which worker finishes first
+        self.jobs: deque = deque()
+        self.retried: set = set()
+        self.lock = threading.RLock()
+        self.closed = False
+
+        # Statistics
+        self.hits = 0
+        self.misses = 0
+        self.generation_times: deque = deque(maxlen=100)
+
+        self.executor = ProcessPoolExecutor(max_workers=workers)
+        self.fill()
+
+    def fill(self) -> None:
+        """
+        Submit new maps to the pool until the jobs reach the depth.
+        """
+        with self.lock:
+            while not self.closed and len(self.jobs) < self.depth:
+                seed, params = self.seeds.getrandbits(63), self.generator.params()
+                self.jobs.append((seed, params, self.submit(seed, params)))
+                self.jobs[-1][2].add_done_callback(self.collect)
+
+    def submit(self, seed: int, params: Tuple) -> Future:
+        """
+        Send one map to the pool. A pool broken by a worker that died, e.g. killed for running
+        out of memory, is replaced by a new one.
+
+        Args:
+            seed (int): The map's seed.
+            params (Tuple): The generator parameters.
+
+        Returns:
+            Future: The generation job, failed if no pool could take it so build generates it in this process.
+        """
+        cache_directory = None if self.cache is None else str(self.cache.directory)
+        for _ in range(2):
+            try:
+                return self.executor.submit(generateMap, type(self.generator), params, seed, cache_directory)
+            except BrokenProcessPool as error:
+                logging.error(f"Map worker pool broke, starting a new one: {error}")
+                self.executor.shutdown(wait=False, cancel_futures=True)
+                self.executor = ProcessPoolExecutor(max_workers=self.workers)
+
+        future: Future = Future()
+        future.set_exception(BrokenProcessPool("No map worker pool could be started"))
+        return future
+
+    def collect(self, future) -> None:
+        """
+        Record the generation time and stats of a finished map.
+
+        Args:
+            future (Future): The finished generation job.
+        """
+        with self.lock:
+            if future.cancelled():
+                return
+            if future.exception() is not None:
+                logging.error("Map generation failed in a worker process", exc_info=future.exception())
+                self.retry(future)
+                return
+            _, generation_time, stats = future.result()
+            self.generation_times.append(generation_time)
+            if self.tuner is not None and stats is not None:
+                self.tuner.observe(stats)
+
+    def retry(self, future: Future) -> None:
+        """
+        Submit a failed job again in its place in the queue, once. If it fails again it is
+        left to build, which generates it in this process when it comes up. Jobs lost with a
+        broken pool are submitted to its replacement the same way.
+
+        Args:
+            future (Future): The failed generation job.
+        """
+        with self.lock:
+            for i, (seed, params, job) in enumerate(self.jobs):
+                if job is future and seed not in self.retried and not self.closed:
+                    self.retried.add(seed)
+                    self.jobs[i] = (seed, params, self.submit(seed, params))
+                    self.jobs[i][2].add_done_callback(self.collect)
+                    break
+        self.fill()
+
+    def get(self) -> TileGrid:
+        """
+        Get the next map, generating one synchronously only if none is ready.
+
+        Returns:
+            TileGrid: The next game grid.
+        """
+        grid = self.take()
+        if grid is None:
+            builder = self.build()
+            builder.finish()
+            grid = self.claim(builder)
+        return grid
+
+    def take(self) -> Optional[TileGrid]:
+        """
+        Get the next map if its worker has finished it, without waiting.
+
+        Returns:
+            TileGrid: The next game grid, None if the oldest job is not ready.
+        """
+        with self.lock:
+            if not self.jobs:
+                return None
+            future = self.jobs[0][2]
+            if not future.done() or future.cancelled() or future.exception() is not None:
+                return None
+            self.retried.discard(self.jobs.popleft()[0])
+
+        self.hits += 1
+        self.fill()
+        return future.result()[0]
+
+    def build(self) -> MapBuilder:
+        """
+        Start generating the oldest job's map in this process, for when it is not ready. The builder
+        does a bounded amount of work per step, so the caller can keep the window responsive.
+
+        Returns:
+            MapBuilder: The builder, hand its map out with claim once it is done.
+        """
+        with self.lock:
+            if self.jobs:
+                seed, params, _ = self.jobs[0]
+            else:
+                seed, params = self.seeds.getrandbits(63), self.generator.params()
+
+        # A generator of its own, so a worker map finishing meanwhile cannot retune it halfway through
+        generator = type(self.generator).fromParams(params)
+        generator.telemetry = self.generator.telemetry
+        steps = None if self.cache is None else self.cache.generateSteps(generator, seed)
+        return MapBuilder(generator, seed, steps=steps, on_done=self.built)
+
+    def built(self, builder: MapBuilder) -> None:
+        """
+        Learn from a map generated in this process.
+
+        Args:
+            builder (MapBuilder): The finished builder, its result is True when the map came from the cache.
+        """
+        if self.tuner is not None and builder.result is not True:
+            with self.lock:
+                self.tuner.observe(builder.generator.stats)
+
+    def claim(self, builder: MapBuilder) -> TileGrid:
+        """
+        Hand out a map built in this process in place of the worker job it was built for, counted as a miss.
+
+        Args:
+            builder (MapBuilder): A finished builder made by build.
+
+        Returns:
+            TileGrid: The next game grid.
+        """
+        with self.lock:
+            if self.jobs and self.jobs[0][0] == builder.generator.seed:
+                self.retried.discard(builder.generator.seed)
+                self.jobs.popleft()[2].cancel()
+
+        self.misses += 1
+        self.fill()
+        return builder.map
+
+    def stats(self) -> Dict[str, Any]:
+        """
+        Get queue depth, hit rate and worker generation times.
+
+        Returns:
+            dict: Current prefetch statistics.
+        """
+        with self.lock:
+            times = list(self.generation_times)
+            ready = sum(future.done() for _, _, future in self.jobs)
+            pending = len(self.jobs) - ready
+
+        requests = self.hits + self.misses
+        return {
+            'ready': ready,
+            'pending': pending,
+            'depth': self.depth,
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': self.hits / requests if requests else 0.0,
+            'mean_generation_time': sum(times) / len(times) if times else 0.0,
+            'max_generation_time': max(times, default=0.0)
+        }
+
+    def close(self) -> None:
+        """
+        Stop the worker pool and drop any maps still being generated.
+        """
+        with self.lock:
+            self.closed = True
+        self.executor.shutdown(wait=False, cancel_futures=True)
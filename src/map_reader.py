@@ -1,3 +1,6 @@
+from tile_grid import TileGrid
+
+
 def read_grid(filename):
 
     # CODE IS SELF EXPLANATORY
@@ -9,7 +12,7 @@ def read_grid(filename):
     with open(filename, 'r') as file:
 
         # read file
-        grid = [list(line.strip()) for line in file.readlines()]
+        grid = TileGrid.fromRows(line.strip() for line in file.readlines())
 
     # return file
     return grid
@@ -0,0 +1,252 @@
+import numpy as np
+from typing import Iterable, List, Optional, Tuple
+from tile_grid import TileGrid, WALL, EMPTY, START, END, SEEKER, COIN
+from spatial_index import SpatialIndex
+from frame_timer import FrameTimer, UPDATE_SEEKERS, CHECK_COLLISIONS
+
+# Player moves as (dx, dy)
+LEFT = (-1, 0)
+RIGHT = (1, 0)
+UP = (0, -1)
+DOWN = (0, 1)
+
+
+class GameState:
+    def __init__(
+            self,
+            grid: TileGrid,
+            tile_width: int,
+            tile_height: int,
+            default_radius: int = 10,
+            radius_growth: int = 4,
+            radius_decay: int = 1
+        ) -> None:
+
+        """
+        Initialize the complete state of one level, independent of any display.
+
+        Args:
+            grid (TileGrid): The game grid. Collected coins are removed from it.
+            tile_width (int): The width of each tile in pixels, used for the noise radius.
+            tile_height (int): The height of each tile in pixels, used for the noise radius.
+            default_radius (int): The noise radius the player rests at.
+            radius_growth (int): How much the noise radius grows with every move.
+            radius_decay (int): How much the noise radius shrinks every tick.
+        """
+        self.grid = grid
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.default_radius = default_radius
+        self.radius_growth = radius_growth
+        self.radius_decay = radius_decay
+
+        # Start, end, seeker posts and coins, indexed by tile in a single pass over the grid
+        self.entities: SpatialIndex = SpatialIndex.fromGrid(grid, (START, END, SEEKER, COIN))
+        starts = self.entities.positions(START)
+        self.start: Optional[Tuple[int, int]] = starts[0] if starts else None
+        self.seeker_posts: np.ndarray = np.array(sorted(self.entities.positions(SEEKER), key=lambda pos: (pos[1], pos[0])), dtype=np.int64).reshape(-1, 2)
+
+        # Walls as a mask with an extra wall column on each side, so seekers bounce off the map edges too
+        self.walls: np.ndarray = np.pad(grid.array() == WALL, ((0, 0), (1, 1)), constant_values=True)
+
+        # Seekers as struct-of-arrays: column, row and direction (+1 right, -1 left)
+        self.seeker_x: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.seeker_y: np.ndarray = np.zeros(0, dtype=np.int64)
+        self.seeker_dir: np.ndarray = np.zeros(0, dtype=np.int64)
+
+        self.player: List[int] = None
+        self.radius = default_radius
+
+        self.coins_collected = 0
+        self.seekers_collisions = 0
+        self.won = False
+        self.tick = 0
+
+        # What happened during the last tick
+        self.seeker_collision = False
+        self.collected_coin: Optional[Tuple[int, int]] = None
+
+    def copy(self) -> 'GameState':
+        """
+        Get an independent copy of the state, for branching simulations.
+
+        Returns:
+            GameState: The copy.
+        """
+        state = GameState.__new__(GameState)
+        state.__dict__.update(self.__dict__)
+        state.grid = self.grid.copy()
+        state.entities = self.entities.copy()
+        state.seeker_x = self.seeker_x.copy()
+        state.seeker_y = self.seeker_y.copy()
+        state.seeker_dir = self.seeker_dir.copy()
+        state.player = None if self.player is None else self.player[:]
+        return state
+
+    @property
+    def seekers(self) -> List[Tuple[int, int]]:
+        """
+        Get the seeker positions as (x, y) tuples, for rendering.
+
+        Returns:
+            List[Tuple[int, int]]: The seeker positions.
+        """
+        return list(zip(self.seeker_x.tolist(), self.seeker_y.tolist()))
+
+    @property
+    def coins(self) -> List[Tuple[int, int]]:
+        """
+        Get the positions of the coins left on the map, in row-major order.
+
+        Returns:
+            List[Tuple[int, int]]: The coin positions.
+        """
+        return sorted(self.entities.positions(COIN), key=lambda pos: (pos[1], pos[0]))
+
+
+def resetGame(state: GameState) -> GameState:
+    """
+    Put the player back on the start and the seekers back on their posts, moving right.
+
+    Args:
+        state (GameState): The state to reset.
+
+    Returns:
+        GameState: The same state.
+    """
+    state.player = None if state.start is None else list(state.start)
+    state.seeker_x = state.seeker_posts[:, 0].copy()
+    state.seeker_y = state.seeker_posts[:, 1].copy()
+    state.seeker_dir = np.ones(len(state.seeker_posts), dtype=np.int64)
+    return state
+
+
+def newGame(grid: TileGrid, tile_width: int, tile_height: int, **rules) -> GameState:
+    """
+    Create the state for a fresh level on the given grid.
+
+    Args:
+        grid (TileGrid): The game grid.
+        tile_width (int): The width of each tile in pixels.
+        tile_height (int): The height of each tile in pixels.
+        **rules: Noise radius rules passed on to GameState.
+
+    Returns:
+        GameState: The new state.
+    """
+    return resetGame(GameState(grid, tile_width, tile_height, **rules))
+
+
+def updateSeekers(state: GameState) -> None:
+    """
+    Move every seeker one tile along its row, turning around at walls.
+
+    Args:
+        state (GameState): The state to update.
+    """
+    new_x = state.seeker_x + state.seeker_dir
+    blocked = state.walls[state.seeker_y, new_x + 1]
+
+    state.seeker_dir = np.where(blocked, -state.seeker_dir, state.seeker_dir)
+    state.seeker_x = np.where(blocked, state.seeker_x, new_x)
+
+
+def checkCollisions(state: GameState) -> Tuple[bool, bool]:
+    """
+    Check whether a seeker hears the player and whether the player picks up a coin.
+
+    Args:
+        state (GameState): The state to update.
+
+    Returns:
+        Tuple[bool, bool]: Whether a seeker heard the player and whether a coin was collected.
+    """
+    tile_width, tile_height = state.tile_width, state.tile_height
+    px, py = state.player
+    seeker_collision = False
+    coin_collected = False
+
+    # Distances are measured in tiles, weighted by the squared tile size and compared to the squared reach in pixels
+    reach = state.radius + tile_width // 2
+    dx, dy = state.seeker_x - px, state.seeker_y - py
+    if (dx * dx * (tile_width * tile_width) + dy * dy * (tile_height * tile_height) < reach * reach).any():
+        seeker_collision = True
+        state.seekers_collisions += 1
+
+    # Only the coins in the chunks around the player are looked at, the first in row-major order is picked up
+    state.collected_coin = None
+    coins = state.entities.within(px, py, tile_width // 2, COIN, (tile_width, tile_height))
+    if coins:
+        x, y, _ = min(coins, key=lambda coin: (coin[1], coin[0]))
+        coin_collected = True
+        state.grid[y][x] = EMPTY
+        state.entities.remove(x, y, COIN)
+        state.coins_collected += 1
+        state.collected_coin = (x, y)
+
+    return seeker_collision, coin_collected
+
+
+def movePlayer(state: GameState, move: Tuple[int, int]) -> bool:
+    """
+    Move the player one tile unless a wall is in the way. Every move makes noise.
+
+    Args:
+        state (GameState): The state to update.
+        move (Tuple[int, int]): The move as (dx, dy).
+
+    Returns:
+        bool: Whether the player moved.
+    """
+    x, y = state.player[0] + move[0], state.player[1] + move[1]
+    if state.grid[y][x] == WALL:
+        return False
+
+    state.player = [x, y]
+    state.radius += state.radius_growth
+    return True
+
+
+def step(
+        state: GameState,
+        action: Optional[Iterable[Tuple[int, int]]] = None,
+        timer: Optional[FrameTimer] = None
+    ) -> GameState:
+
+    """
+    Advance the game by one tick. The state is updated in place and returned.
+
+    Args:
+        state (GameState): The state to advance.
+        action (Iterable): The moves the player made during this tick, usually none or one.
+        timer (FrameTimer): Records the time spent moving seekers and checking collisions, if given.
+
+    Returns:
+        GameState: The advanced state.
+    """
+    if state.won:
+        return state
+
+    updateSeekers(state)
+    if timer is not None:
+        timer.lap(UPDATE_SEEKERS)
+
+    state.seeker_collision, _ = checkCollisions(state)
+    if timer is not None:
+        timer.lap(CHECK_COLLISIONS)
+    if state.seeker_collision:
+        state.radius = state.default_radius
+        resetGame(state)
+
+    # Reaching the end is noticed on the tick after the player steps on it
+    if state.grid[state.player[1]][state.player[0]] == END:
+        state.won = True
+
+    for move in action or ():
+        movePlayer(state, move)
+
+    if not state.won:
+        state.radius = max(state.default_radius, state.radius - state.radius_decay)
+
+    state.tick += 1
+    return state
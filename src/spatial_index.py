@@ -0,0 +1,186 @@
+from math import ceil
+from typing import Dict, Iterable, List, Optional, Set, Tuple
+from tile_grid import TileGrid
+
+
+class SpatialIndex:
+    def __init__(self, chunk_size: int = 8) -> None:
+        """
+        Initialize an empty spatial hash of entities keyed by tile coordinate.
+        Every tile maps to the entity kinds on it and every chunk of
+        chunk_size x chunk_size tiles to the occupied tiles inside it.
+
+        Args:
+            chunk_size (int): The width and height of a chunk in tiles.
+        """
+        self.chunk_size = chunk_size
+        self.cells: Dict[Tuple[int, int], List[int]] = {}
+        self.chunks: Dict[Tuple[int, int], Set[Tuple[int, int]]] = {}
+        self.kinds: Dict[int, Set[Tuple[int, int]]] = {}
+
+    @classmethod
+    def fromGrid(cls, grid: TileGrid, tiles: Iterable[int], chunk_size: int = 8) -> 'SpatialIndex':
+        """
+        Build an index of every cell of the grid holding one of the given tiles.
+
+        Args:
+            grid (TileGrid): The grid to index.
+            tiles (Iterable[int]): The tile codes to index, the code is used as the entity kind.
+            chunk_size (int): The width and height of a chunk in tiles.
+
+        Returns:
+            SpatialIndex: The new index.
+        """
+        index = cls(chunk_size)
+        for tile in tiles:
+            for x, y in grid.find(tile):
+                index.add(x, y, tile)
+        return index
+
+    def copy(self) -> 'SpatialIndex':
+        """
+        Get an independent copy of the index.
+
+        Returns:
+            SpatialIndex: The copy.
+        """
+        index = SpatialIndex(self.chunk_size)
+        index.cells = {pos: kinds[:] for pos, kinds in self.cells.items()}
+        index.chunks = {chunk: set(positions) for chunk, positions in self.chunks.items()}
+        index.kinds = {kind: set(positions) for kind, positions in self.kinds.items()}
+        return index
+
+    def add(self, x: int, y: int, kind: int) -> None:
+        """
+        Add an entity to the tile at (x, y).
+
+        Args:
+            x (int): Column of the tile.
+            y (int): Row of the tile.
+            kind (int): The kind of entity.
+        """
+        pos = (x, y)
+        kinds = self.cells.get(pos)
+        if kinds is None:
+            self.cells[pos] = [kind]
+            self.chunks.setdefault((x // self.chunk_size, y // self.chunk_size), set()).add(pos)
+        else:
+            kinds.append(kind)
+        self.kinds.setdefault(kind, set()).add(pos)
+
+    def remove(self, x: int, y: int, kind: int) -> bool:
+        """
+        Remove an entity from the tile at (x, y).
+
+        Args:
+            x (int): Column of the tile.
+            y (int): Row of the tile.
+            kind (int): The kind of entity.
+
+        Returns:
+            bool: Whether there was such an entity to remove.
+        """
+        pos = (x, y)
+        kinds = self.cells.get(pos)
+        if kinds is None or kind not in kinds:
+            return False
+
+        kinds.remove(kind)
+        if kind not in kinds:
+            self.kinds[kind].discard(pos)
+        if not kinds:
+            del self.cells[pos]
+            chunk = (x // self.chunk_size, y // self.chunk_size)
+            self.chunks[chunk].discard(pos)
+            if not self.chunks[chunk]:
+                del self.chunks[chunk]
+        return True
+
+    def at(self, x: int, y: int) -> List[int]:
+        """
+        Get the kinds of entity on the tile at (x, y).
+
+        Args:
+            x (int): Column of the tile.
+            y (int): Row of the tile.
+
+        Returns:
+            List[int]: The entity kinds, empty if the tile holds none.
+        """
+        return self.cells.get((x, y), [])
+
+    def has(self, x: int, y: int, kind: int) -> bool:
+        """
+        Check whether the tile at (x, y) holds an entity of the given kind.
+
+        Args:
+            x (int): Column of the tile.
+            y (int): Row of the tile.
+            kind (int): The kind of entity.
+
+        Returns:
+            bool: Whether the entity is there.
+        """
+        return kind in self.cells.get((x, y), ())
+
+    def positions(self, kind: int) -> List[Tuple[int, int]]:
+        """
+        Get every tile holding an entity of the given kind.
+
+        Args:
+            kind (int): The kind of entity.
+
+        Returns:
+            List[Tuple[int, int]]: The tiles, in no particular order.
+        """
+        return list(self.kinds.get(kind, ()))
+
+    def count(self, kind: int) -> int:
+        """
+        Get the number of tiles holding an entity of the given kind.
+
+        Args:
+            kind (int): The kind of entity.
+
+        Returns:
+            int: The number of tiles.
+        """
+        return len(self.kinds.get(kind, ()))
+
+    def within(
+            self,
+            x: int,
+            y: int,
+            radius: float,
+            kind: Optional[int] = None,
+            scale: Tuple[float, float] = (1, 1)
+        ) -> List[Tuple[int, int, int]]:
+
+        """
+        Get the entities strictly within a radius of the tile at (x, y).
+        Only the chunks overlapping the radius are visited.
+
+        Args:
+            x (int): Column of the centre tile.
+            y (int): Row of the centre tile.
+            radius (float): The radius, in the units given by scale.
+            kind (int): Only return entities of this kind, if given.
+            scale (Tuple[float, float]): The width and height of a tile, e.g. in pixels, at least 1 each.
+
+        Returns:
+            List[Tuple[int, int, int]]: The column, row and kind of every entity found.
+        """
+        # Tiles under a pixel wide round down to 0 on very large maps, they are treated as 1 pixel
+        scale_x, scale_y = max(1, scale[0]), max(1, scale[1])
+        reach_x, reach_y = ceil(radius / scale_x), ceil(radius / scale_y)
+        radius_squared = radius * radius
+        size = self.chunk_size
+
+        found = []
+        for chunk_y in range((y - reach_y) // size, (y + reach_y) // size + 1):
+            for chunk_x in range((x - reach_x) // size, (x + reach_x) // size + 1):
+                for pos in self.chunks.get((chunk_x, chunk_y), ()):
+                    dx, dy = (pos[0] - x) * scale_x, (pos[1] - y) * scale_y
+                    if dx * dx + dy * dy < radius_squared:
+                        found.extend((pos[0], pos[1], entity) for entity in self.cells[pos] if kind is None or entity == kind)
+        return found
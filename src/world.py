@@ -0,0 +1,145 @@
+import numpy as np
+from math import ceil
+from typing import Optional, Tuple
+from chunk_world import ChunkWorld
+from simulation import GameState, newGame
+
+
+class WorldGame:
+    def __init__(
+            self,
+            world: ChunkWorld,
+            tile_width: int,
+            tile_height: int,
+            view: Tuple[int, int],
+            **rules
+        ) -> None:
+
+        """
+        Initialize a game in an endless chunked world. The simulation runs on a window of
+        the chunks around the player, which is moved whenever the player enters another chunk.
+
+        Args:
+            world (ChunkWorld): The world to play in.
+            tile_width (int): The width of each tile in pixels, used for the noise radius.
+            tile_height (int): The height of each tile in pixels, used for the noise radius.
+            view (Tuple[int, int]): The number of columns and rows of tiles seen on screen.
+            **rules: Noise radius rules passed on to GameState.
+        """
+        self.world = world
+        self.tile_width = tile_width
+        self.tile_height = tile_height
+        self.rules = rules
+
+        # Enough chunks to cover the view wherever the player is in the centre chunk, plus one ring for the seekers just out of sight
+        self.radius_x = ceil(view[0] / 2 / world.width) + 1
+        self.radius_y = ceil(view[1] / 2 / world.height) + 1
+        world.keep_radius = max(world.keep_radius, self.radius_x + 1, self.radius_y + 1)
+
+        self.state: GameState = None
+        self.origin: Tuple[int, int] = (0, 0)
+        self.centre: Optional[Tuple[int, int]] = None
+        self.recentres = 0
+        self.recentre(world.chunkOf(*world.spawn))
+
+    def reset(self, seed: Optional[int] = None) -> None:
+        """
+        Move on to the next world and start at its spawn.
+
+        Args:
+            seed (int): Seed of the world, drawn from the generator's seed stream if not given.
+        """
+        self.world.reset(seed)
+        self.state = None
+        self.recentre(self.world.chunkOf(*self.world.spawn))
+
+    def playerPosition(self) -> Tuple[int, int]:
+        """
+        Get the player's position in world tiles.
+
+        Returns:
+            Tuple[int, int]: The player's column and row.
+        """
+        return self.state.player[0] + self.origin[0], self.state.player[1] + self.origin[1]
+
+    def follow(self) -> bool:
+        """
+        Move the window onto the chunks around the player if the player left the centre chunk.
+
+        Returns:
+            bool: Whether the window moved, which replaces the state.
+        """
+        centre = self.world.chunkOf(*self.playerPosition())
+        if centre == self.centre:
+            return False
+        self.recentre(centre)
+        return True
+
+    def recentre(self, centre: Tuple[int, int]) -> None:
+        """
+        Build the state for the window around a chunk, carrying the player, the score and
+        the seekers of chunks that stay loaded over from the current state.
+
+        Args:
+            centre (Tuple[int, int]): The chunk at the centre of the new window.
+        """
+        grid, origin = self.world.window(centre[0], centre[1], self.radius_x, self.radius_y)
+        state = newGame(grid, self.tile_width, self.tile_height, **self.rules)
+        old = self.state
+
+        if old is None:
+            state.player = [self.world.spawn[0] - origin[0], self.world.spawn[1] - origin[1]]
+        else:
+            dx, dy = self.origin[0] - origin[0], self.origin[1] - origin[1]
+            state.player = [old.player[0] + dx, old.player[1] + dy]
+            state.radius = old.radius
+            state.coins_collected = old.coins_collected
+            state.seekers_collisions = old.seekers_collisions
+            state.tick = old.tick
+
+            # Seekers are matched by the world tile of their post, and keep patrolling if they are still on the window
+            old_keys = self.postKeys(old.seeker_posts, self.origin)
+            new_keys = self.postKeys(state.seeker_posts, origin)
+            _, new_index, old_index = np.intersect1d(new_keys, old_keys, assume_unique=True, return_indices=True)
+            x, y = old.seeker_x[old_index] + dx, old.seeker_y[old_index] + dy
+            inside = (x >= 0) & (x < grid.width) & (y >= 0) & (y < grid.height)
+            new_index, old_index = new_index[inside], old_index[inside]
+            state.seeker_x[new_index] = x[inside]
+            state.seeker_y[new_index] = y[inside]
+            state.seeker_dir[new_index] = old.seeker_dir[old_index]
+
+        # Being caught sends the player back to where they entered this part of the world
+        state.start = tuple(state.player)
+
+        self.state = state
+        self.origin = origin
+        self.centre = centre
+        self.recentres += 1
+        self.world.evict(*centre)
+
+    @staticmethod
+    def postKeys(posts: np.ndarray, origin: Tuple[int, int]) -> np.ndarray:
+        """
+        Encode seeker posts as one integer per post, in world tiles.
+
+        Args:
+            posts (np.ndarray): The posts as (x, y) rows, relative to origin.
+            origin (Tuple[int, int]): The world tile of the window's top left corner.
+
+        Returns:
+            np.ndarray: The keys.
+        """
+        return (posts[:, 1] + origin[1]) * (1 << 32) + (posts[:, 0] + origin[0])
+
+    def collect(self) -> Optional[Tuple[int, int]]:
+        """
+        Remove the coin collected during the last tick from the world, so it stays gone.
+
+        Returns:
+            Tuple[int, int]: The coin's world tile, None if no coin was collected.
+        """
+        if self.state.collected_coin is None:
+            return None
+        x, y = self.state.collected_coin[0] + self.origin[0], self.state.collected_coin[1] + self.origin[1]
+        self.world.collect(x, y)
+        return x, y